@@ -0,0 +1,187 @@
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+import typing as ty
+
+import typedparse
+import typedparse.spec as spec
+from benchmarks.synthetic import SyntheticModule, command_line
+from typedparse.argparse import ArgParserFactory, ArgParserOptions
+from typedparse.fast import FastParserFactory
+
+
+def _timing(func: ty.Callable[[], ty.Any], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def _contention(func: ty.Callable[[], ty.Any], threads: int, calls: int = 200) -> float:
+    """Wall time per call when the threads call the function at the same time."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+
+        for _ in range(calls):
+            func()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+
+    for worker_thread in workers:
+        worker_thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+
+    for worker_thread in workers:
+        worker_thread.join()
+
+    return (time.perf_counter() - start) / (threads * calls)
+
+
+def _memory(func: ty.Callable[[], ty.Any]) -> ty.Tuple[int, int]:
+    tracemalloc.start()
+
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+        return current, peak
+    finally:
+        tracemalloc.stop()
+
+
+def _import_time(module: str, repeat: int) -> float:
+    def run(code: str) -> float:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        return time.perf_counter() - start
+
+    empty = min(run("pass") for _ in range(repeat))
+    return min(run(f"import {module}") for _ in range(repeat)) - empty
+
+
+def _measure(name: str, obj: ty.Any, options: ArgParserOptions, args: ty.List[str],
+             repeat: int) -> ty.Dict[str, ty.Any]:
+    try:
+        sp = spec.create(obj)
+        ArgParserFactory(options).create(sp)
+    except ValueError as e:
+        return {"name": name, "error": str(e)}
+
+    parser = ArgParserFactory(options).create(sp)
+    fast_parser = FastParserFactory(options).create(sp)
+    retained, peak = _memory(lambda: ArgParserFactory(options).create(spec.create(obj)))
+    spec_memory, _ = _memory(lambda: spec.create(obj))
+
+    return {
+        "name": name,
+        "spec_create": _timing(lambda: spec.create(obj), repeat),
+        "spec_create_lazy_docs": _timing(lambda: spec.create(obj, lazy_docs=True), repeat),
+        "parser_create": _timing(lambda: ArgParserFactory(options).create(sp), repeat),
+        "parse": _timing(lambda: parser.parse(args), repeat),
+        "fast_parse": _timing(lambda: fast_parser.parse(args), repeat),
+        "bind": _timing(lambda: parser.bind(args), repeat),
+        "bind_4_threads": min(_contention(lambda: parser.bind(args), 4) for _ in range(repeat)),
+        "fast_bind_4_threads": min(_contention(lambda: fast_parser.bind(args), 4) for _ in range(repeat)),
+        "retained_memory": retained,
+        "peak_memory": peak,
+        "spec_memory": spec_memory
+    }
+
+
+def measure(commands: int, args: int, repeat: int) -> ty.List[ty.Dict[str, ty.Any]]:
+    synthetic = SyntheticModule(commands, args)
+
+    try:
+        module, baseline = synthetic.load()
+        argv = command_line(commands - 1, args)
+        results = []
+
+        for shape, obj in [("functions", module.FUNCTIONS), ("class", module.CLI())]:
+            for short in [False, True]:
+                name = f"{shape}-{commands}x{args}" + ("-short" if short else "")
+                options = ArgParserOptions(generate_short_flags=short)
+                results.append(_measure(name, obj, options, argv, repeat))
+
+        parser = baseline.build()
+        retained, peak = _memory(baseline.build)
+
+        results.append({
+            "name": f"argparse-{commands}x{args}",
+            "parser_create": _timing(baseline.build, repeat),
+            "parse": _timing(lambda: parser.parse_args(argv), repeat),
+            "retained_memory": retained,
+            "peak_memory": peak
+        })
+
+        return results
+    finally:
+        synthetic.close()
+
+
+def run(output: ty.Optional[str] = None, sizes: ty.Optional[ty.List[str]] = None, repeat: ty.Optional[int] = 5):
+    """Run benchmarks on synthetic CLIs
+
+    Args:
+        output: file to write the JSON report to, stdout by default
+        sizes: sizes of CLIs in the form <commands>x<arguments>, e.g. 100x10
+        repeat: number of repetitions of each measurement
+    """
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "import": {"typedparse": _import_time("typedparse", repeat)},
+        "results": []
+    }
+
+    for size in sizes or ["10x5", "100x5", "400x10", "1x2000"]:
+        commands, args = (int(v) for v in size.split("x"))
+        report["results"] += measure(commands, args, repeat)
+
+    text = json.dumps(report, indent=2)
+
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def compare(baseline: str, current: str):
+    """Compare two benchmark reports
+
+    Args:
+        baseline: report of the baseline commit
+        current: report of the current commit
+    """
+    with open(baseline) as f:
+        before = json.load(f)
+
+    with open(current) as f:
+        after = json.load(f)
+
+    rows = [("import", "typedparse", before["import"]["typedparse"], after["import"]["typedparse"])]
+    results = {r["name"]: r for r in before["results"]}
+
+    for result in after["results"]:
+        previous = results.get(result["name"], {})
+
+        for metric, value in result.items():
+            if metric != "name" and isinstance(value, (int, float)) and isinstance(previous.get(metric), (int, float)):
+                rows.append((result["name"], metric, previous[metric], value))
+
+    for name, metric, old, new in rows:
+        ratio = new / old if old else float("nan")
+        print(f"{name:<32} {metric:<16} {old:>14.6g} {new:>14.6g} {ratio:>8.2f}x")
+
+
+if __name__ == "__main__":
+    typedparse.parse([run, compare])
@@ -0,0 +1,133 @@
+import importlib
+import os
+import sys
+import tempfile
+import types
+import typing as ty
+
+_KINDS = ["positional", "optional", "flag", "list"]
+
+
+def _argument(index: int) -> ty.Tuple[str, str, str]:
+    kind = _KINDS[index % len(_KINDS)]
+
+    if kind == "positional":
+        return f"name_{index}", "str", ""
+    elif kind == "optional":
+        return f"count_{index}", "ty.Optional[int]", f" = {index}"
+    elif kind == "flag":
+        return f"verbose_{index}", "ty.Optional[bool]", " = False"
+    else:
+        return f"items_{index}", "ty.Optional[ty.List[int]]", " = None"
+
+
+def _function(name: str, args: int, method: bool) -> str:
+    params = [_argument(i) for i in range(args)]
+    # positional parameters first, so the signature is valid
+    params.sort(key=lambda p: p[2] != "")
+    signature = ", ".join((["self"] if method else []) + [f"{n}: {t}{d}" for n, t, d in params])
+    indent = "    " if method else ""
+    doc = "\n".join(f"{indent}        {n}: description of {n}" for n, _, _ in params)
+
+    return (f"{indent}def {name}({signature}):\n"
+            f"{indent}    \"\"\"Command {name}\n\n"
+            f"{indent}    Args:\n"
+            f"{doc}\n"
+            f"{indent}    \"\"\"\n"
+            f"{indent}    return None\n")
+
+
+def source(commands: int, args: int) -> str:
+    """Generate the source of a module with functions `command_<i>` and a class `CLI` with the same methods."""
+    parts = ["import typing as ty\n"]
+    parts += [_function(f"command_{i}", args, False) for i in range(commands)]
+    parts.append("class CLI:\n    \"\"\"Synthetic command line interface\"\"\"\n")
+    parts += [_function(f"command_{i}", args, True) for i in range(commands)]
+    parts.append("FUNCTIONS = [" + ", ".join(f"command_{i}" for i in range(commands)) + "]\n")
+    return "\n\n".join(parts)
+
+
+def argparse_source(commands: int, args: int) -> str:
+    """Generate the source of a function `build` which creates the same parser with argparse directly."""
+    lines = ["import argparse", "", "", "def build():",
+             "    parser = argparse.ArgumentParser()",
+             "    sub = parser.add_subparsers()"]
+
+    for i in range(commands):
+        lines.append(f"    p = sub.add_parser('command_{i}')")
+
+        for index in range(args):
+            name, tpe, _ = _argument(index)
+            kind = _KINDS[index % len(_KINDS)]
+            flag = "--" + name.replace("_", "-")
+
+            if kind == "positional":
+                lines.append(f"    p.add_argument('{name}', help='description of {name}')")
+            elif kind == "optional":
+                lines.append(f"    p.add_argument('{flag}', dest='{name}', type=int, nargs='?', default={index}, "
+                             f"help='description of {name}')")
+            elif kind == "flag":
+                lines.append(f"    p.add_argument('{flag}', dest='{name}', action='store_true', "
+                             f"help='description of {name}')")
+            else:
+                lines.append(f"    p.add_argument('{flag}', dest='{name}', type=int, nargs='+', "
+                             f"help='description of {name}')")
+
+        lines.append(f"    p.set_defaults(func=lambda args: None)")
+
+    lines.append("    return parser")
+    return "\n".join(lines) + "\n"
+
+
+def command_line(command: int, args: int) -> ty.List[str]:
+    """Command line which sets every argument of the command."""
+    result = [f"command_{command}"]
+    result += [f"value{index}" for index in range(args) if _KINDS[index % len(_KINDS)] == "positional"]
+
+    for index in range(args):
+        name, _, _ = _argument(index)
+        kind = _KINDS[index % len(_KINDS)]
+        flag = "--" + name.replace("_", "-")
+
+        if kind == "optional":
+            result += [flag, str(index)]
+        elif kind == "flag":
+            result.append(flag)
+        elif kind == "list":
+            result += [flag, "1", "2", "3"]
+
+    return result
+
+
+class SyntheticModule(object):
+    """Write generated sources into a temporary directory and import them as real modules."""
+
+    def __init__(self, commands: int, args: int):
+        self.commands = commands
+        self.args = args
+        self.name = f"synthetic_{commands}x{args}"
+        self._tmp = tempfile.TemporaryDirectory()
+
+        with open(os.path.join(self._tmp.name, f"{self.name}.py"), "w") as f:
+            f.write(source(commands, args))
+
+        with open(os.path.join(self._tmp.name, f"{self.name}_argparse.py"), "w") as f:
+            f.write(argparse_source(commands, args))
+
+    @property
+    def path(self) -> str:
+        return self._tmp.name
+
+    def load(self) -> ty.Tuple[types.ModuleType, types.ModuleType]:
+        sys.path.insert(0, self.path)
+
+        try:
+            importlib.invalidate_caches()
+            return importlib.import_module(self.name), importlib.import_module(f"{self.name}_argparse")
+        finally:
+            sys.path.remove(self.path)
+
+    def close(self):
+        sys.modules.pop(self.name, None)
+        sys.modules.pop(f"{self.name}_argparse", None)
+        self._tmp.cleanup()
@@ -1,9 +1,19 @@
+import array
+import asyncio
+import enum
+import io
+import os
+import sys
+import tempfile
 import typing as ty
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from typedparse import options
-from typedparse.argparse import ArgParserFactory, ArgParserOptions
+import typedparse.spec as spec
+from typedparse import command, options
+from typedparse.argparse import ArgParserExit, ArgParserFactory, ArgParserLeaf, ArgParserOptions, _arguments
+from typedparse.fast import FastParserFactory
 
 
 class ArgsHolder:
@@ -357,6 +367,37 @@ class TestArgParse(unittest.TestCase):
         self.assertFalse(holder.args["bar"])
         self.assertTrue(holder.args["baz"])
 
+    def test_short_flag_conflicts(self):
+        @options(size="-s")
+        def main(host: ty.Optional[str] = None, scale: ty.Optional[int] = None, size: ty.Optional[int] = None):
+            """Test
+
+            Args:
+                host: host
+                scale: scale
+                size: size
+            """
+
+        flags = [flags for _, flags, _ in _arguments(ArgParserOptions(generate_short_flags=True), spec.create(main))]
+        self.assertEqual([["--host", "-o"], ["--scale", "-c"], ["--size", "-s"]], flags)
+
+        @options(first="-x", second="-x", third=["--first", "-y"])
+        def conflicts(first: ty.Optional[int] = None, second: ty.Optional[int] = None,
+                      third: ty.Optional[int] = None):
+            """Test
+
+            Args:
+                first: first
+                second: second
+                third: third
+            """
+
+        with self.assertRaises(ValueError) as cm:
+            ArgParserFactory().create(conflicts)
+
+        self.assertEqual("Conflicting flags in 'conflicts': --first (first, third), -x (first, second)",
+                         str(cm.exception))
+
     def test_snake_and_kebab_case(self):
         holder = ArgsHolder()
 
@@ -423,3 +464,311 @@ class TestArgParse(unittest.TestCase):
         except ValueError:
             pass
 
+
+    def test_lazy_subparsers(self):
+        holder = ArgsHolder()
+
+        class CLI:
+            def add(self, name: str):
+                """Add profile
+
+                Args:
+                    name: profile name
+                """
+                holder.command = "add"
+                holder.args["name"] = name
+
+            def remove(self, name: str, force: ty.Optional[bool] = False):
+                """Remove profile
+
+                Args:
+                    name: profile name
+                    force: remove without confirmation
+                """
+                holder.command = "remove"
+                holder.args["force"] = force
+
+        with mock.patch.object(ArgParserLeaf, "__init__", autospec=True,
+                               side_effect=ArgParserLeaf.__init__) as init:
+            parser = ArgParserFactory(ArgParserOptions(lazy_subparsers=True)).create(CLI())
+            self.assertEqual(0, init.call_count)
+
+            parser.parse(["remove", "test", "--force"])
+            self.assertEqual(1, init.call_count)
+            self.assertEqual("remove", holder.command)
+            self.assertTrue(holder.args["force"])
+
+            parser.parse(["remove", "test"])
+            self.assertEqual(1, init.call_count)
+            self.assertFalse(holder.args["force"])
+
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            parser.parse(["qqq"])
+
+    def test_lazy_docs(self):
+        holder = ArgsHolder()
+
+        class CLI:
+            """Profiles"""
+
+            def remove(self, name: str, force: ty.Optional[bool] = False):
+                """Remove profile
+
+                Args:
+                    name: profile name
+                """
+                holder.args["force"] = force
+
+        options = ArgParserOptions(lazy_docs=True, exit_on_error=False)
+
+        with mock.patch.object(spec, "parse", wraps=spec.parse) as parse:
+            parser = ArgParserFactory(options).create(CLI())
+            parser.parse(["remove", "test", "--force"])
+            self.assertTrue(holder.args["force"])
+            parse.assert_not_called()
+
+            for args, expected in [([], "Remove profile"), (["remove"], "profile name")]:
+                with self.assertRaises(ArgParserExit), mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                    parser.parse(args + ["-h"])
+
+                self.assertIn(expected, stdout.getvalue())
+
+    def test_lazy_instances(self):
+        holder = ArgsHolder()
+        created = []
+
+        class CLI:
+            """Tool"""
+
+            def __init__(self):
+                created.append(type(self).__name__)
+
+            def show(self, name: str):
+                """Show
+
+                Args:
+                    name: a name
+                """
+                holder.args["show"] = (self, name)
+
+            class Settings:
+                timeout = 3
+
+            class Users:
+                """Manage users"""
+
+                def __init__(self):
+                    created.append(type(self).__name__)
+
+                def add(self, name: str):
+                    """Add user
+
+                    Args:
+                        name: user's name
+                    """
+                    holder.args["add"] = name
+
+        for factory in [ArgParserFactory(), FastParserFactory()]:
+            created.clear()
+            parser = factory.create(CLI)
+
+            with self.assertRaises(SystemExit), mock.patch("sys.stdout"):
+                parser.parse(["users", "-h"])
+
+            self.assertEqual([], created)
+
+            parser.parse(["users", "add", "john"])
+            self.assertEqual("john", holder.args["add"])
+            self.assertEqual(["Users"], created)
+
+            parser.parse(["show", "a"])
+            parser.parse(["show", "b"])
+            self.assertEqual(["Users", "CLI"], created)
+            self.assertEqual("b", holder.args["show"][1])
+
+        def version():
+            """Show version"""
+
+        sp = ty.cast(spec.ParserNode, spec.create([CLI, version]))
+        self.assertEqual(["cli", "version"], [c.name for c in sp.children])
+        self.assertEqual(["users", "show"], [c.name for c in ty.cast(spec.ParserNode, sp.children[0]).children])
+
+        # an instance has the same commands as its class, classes without commands are not groups
+        sp = ty.cast(spec.ParserNode, spec.create(CLI()))
+        self.assertEqual(["users", "show"], [c.name for c in sp.children])
+
+        ArgParserFactory().create(CLI()).parse(["users", "add", "jane"])
+        self.assertEqual("jane", holder.args["add"])
+
+    def test_command_refs(self):
+        sys.modules.pop("examples.commands", None)
+
+        parser = ArgParserFactory().create([command("examples.commands:CliExample", "users", "Manage users")])
+        self.assertNotIn("examples.commands", sys.modules)
+
+        parser.parse(["users", "add", "john", "--email", "john@mycompany.com"])
+        self.assertIn("examples.commands", sys.modules)
+
+    def test_resolved_types(self):
+        holder = ArgsHolder()
+
+        class Mode(enum.Enum):
+            FAST = "fast"
+            SLOW = "slow"
+
+        def main(point: ty.Tuple[float, float], tags: ty.Optional[ty.Set[str]] = None,
+                 mode: ty.Optional[Mode] = Mode.FAST, level: ty.Optional[ty.Literal[1, 2, 3]] = 1,
+                 key: ty.Optional[ty.Union[int, str]] = None):
+            """Test
+
+            Args:
+                point: a point
+                tags: some tags
+                mode: a mode
+                level: a level
+                key: a key
+            """
+            holder.args.update(point=point, tags=tags, mode=mode, level=level, key=key)
+
+        parser = ArgParserFactory().create(main)
+        parser.parse(["1", "2.5", "--tags", "a", "b", "a", "--mode", "SLOW", "--level", "3", "--key", "x"])
+
+        self.assertEqual((1.0, 2.5), holder.args["point"])
+        self.assertEqual({"a", "b"}, holder.args["tags"])
+        self.assertEqual(Mode.SLOW, holder.args["mode"])
+        self.assertEqual(3, holder.args["level"])
+        self.assertEqual("x", holder.args["key"])
+
+        parser.parse(["1", "2", "--key", "10"])
+        self.assertEqual(Mode.FAST, holder.args["mode"])
+        self.assertEqual(10, holder.args["key"])
+
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            parser.parse(["1", "2", "--level", "4"])
+
+    def test_string_annotations(self):
+        holder = ArgsHolder()
+
+        def main(path: "Path", number: "ty.Optional[int]" = 1):
+            """Test
+
+            Args:
+                path: a path
+                number: a number
+            """
+            holder.args["path"] = path
+            holder.args["number"] = number
+
+        parser = ArgParserFactory().create(main)
+        parser.parse(["test.txt", "--number", "2"])
+
+        self.assertEqual(Path("test.txt"), holder.args["path"])
+        self.assertEqual(2, holder.args["number"])
+
+    def test_async(self):
+        holder = ArgsHolder()
+
+        async def main(name: str, delay: ty.Optional[float] = 0.0):
+            """Test
+
+            Args:
+                name: a name
+                delay: a delay
+            """
+            await asyncio.sleep(delay)
+            holder.args["name"] = name
+
+        ArgParserFactory().create(main).parse(["test"])
+        self.assertEqual("test", holder.args["name"])
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            ArgParserFactory(ArgParserOptions(loop=loop)).create(main).parse(["test2"])
+            self.assertEqual("test2", holder.args["name"])
+            self.assertFalse(loop.is_closed())
+        finally:
+            loop.close()
+
+    def test_async_concurrency(self):
+        active = []
+        seen = []
+
+        @options(items={"concurrency": 2})
+        async def main(items: ty.List[int], scale: ty.Optional[int] = 1):
+            """Test
+
+            Args:
+                items: items to process
+                scale: a scale
+            """
+            active.append(items)
+            self.assertLessEqual(len(active), 2)
+            await asyncio.sleep(0.001)
+            seen.append(items * scale)
+            active.remove(items)
+
+        ArgParserFactory().create(main).parse(["1", "2", "3", "4", "5", "--scale", "10"])
+        self.assertEqual([10, 20, 30, 40, 50], sorted(seen))
+
+        @options(items={"concurrency": 2})
+        def sync_main(items: ty.List[int]):
+            """Test
+
+            Args:
+                items: items to process
+            """
+
+        with self.assertRaises(ValueError):
+            ArgParserFactory().create(sync_main)
+
+    def test_iterators(self):
+        seen = []
+
+        def main(items: ty.Iterator[int], words: ty.Optional[ty.Iterable[str]] = None):
+            """Test
+
+            Args:
+                items: items to process
+                words: words
+            """
+            seen.append((next(items), list(items), words and list(words)))
+
+        with mock.patch("sys.stdin", io.StringIO("1 2\n3")):
+            ArgParserFactory().create(main).parse([])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "words.txt")
+
+            with open(path, "w") as f:
+                f.write("a b\nc")
+
+            with mock.patch("sys.stdin", io.StringIO("4")):
+                ArgParserFactory().create(options(words={"delimiter": "\n"})(main)).parse(["-", "--words", path])
+
+        self.assertEqual([(1, [2, 3], None), (4, [], ["a b", "c"])], seen)
+
+    def test_arrays(self):
+        seen = []
+
+        @options(xs={"array": True, "min": 0}, ys={"array": True})
+        def main(xs: ty.List[int], ys: ty.Optional[ty.List[float]] = None):
+            """Test
+
+            Args:
+                xs: integers
+                ys: floats
+            """
+            seen.append((xs, ys))
+
+        for factory in [ArgParserFactory, FastParserFactory]:
+            parser = factory().create(main)
+            parser.parse(["1", "2", "--ys", "0.5"])
+            parser.parse(["3"])
+
+            for args in [["1", "x"], ["-1"]]:
+                with mock.patch("sys.stderr"), self.assertRaises(SystemExit):
+                    parser.parse(args)
+
+        expected = [(array.array("q", [1, 2]), array.array("d", [0.5])), (array.array("q", [3]), None)]
+        self.assertEqual(expected * 2, seen)
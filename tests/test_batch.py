@@ -0,0 +1,69 @@
+import io
+import typing as ty
+import unittest
+from unittest import mock
+
+import typedparse
+from typedparse.argparse import ArgParserError, ArgParserFactory, ArgParserOptions
+
+
+class TestBatch(unittest.TestCase):
+    def test_batch(self):
+        calls = []
+
+        class CLI(object):
+            def add(self, x: int, y: int, name: ty.Optional[str] = None):
+                """Add
+
+                Args:
+                    x: first
+                    y: second
+                    name: a name
+                """
+                calls.append((x + y, name))
+
+            def fail(self):
+                """Fail"""
+                raise RuntimeError("boom")
+
+        lines = "\n".join([
+            "# comment",
+            "add 1 2",
+            "",
+            "add 3 x",
+            "add 1 1 --name 'a b'",
+            "fail",
+            "add 'unterminated",
+            "unknown"
+        ])
+
+        for fast in [False, True]:
+            calls.clear()
+            errors = io.StringIO()
+
+            with mock.patch("sys.stderr", errors):
+                summary = typedparse.parse(CLI(), fast=fast, batch=io.StringIO(lines))
+
+            self.assertEqual([(3, None), (2, "a b")], calls)
+            self.assertEqual(6, summary.lines)
+            self.assertEqual([4, 6, 7, 8], [number for number, _ in summary.failures])
+            self.assertIn("invalid int value", summary.failures[0][1])
+            self.assertEqual("RuntimeError: boom", summary.failures[1][1])
+            self.assertIn("line 4:", errors.getvalue())
+            self.assertIn("6 lines, 4 failed", errors.getvalue())
+
+    def test_raising_parser(self):
+        def main(x: int):
+            """Main
+
+            Args:
+                x: a number
+            """
+
+        parser = ArgParserFactory(ArgParserOptions(exit_on_error=False)).create(main)
+
+        with self.assertRaises(ArgParserError) as cm:
+            parser.parse(["x"])
+
+        self.assertEqual(2, cm.exception.status)
+        self.assertIn("invalid int value", cm.exception.message)
@@ -0,0 +1,115 @@
+import concurrent.futures
+import os
+import typing as ty
+import unittest
+from unittest import mock
+
+import typedparse.types as types
+from typedparse.argparse import ArgParserFactory, ArgParserOptions
+from typedparse.fast import FastParserFactory
+
+calls = []
+
+
+def add(name: str, count: ty.Optional[int] = 1):
+    """Add user
+
+    Args:
+        name: user's name
+        count: number of copies
+    """
+    calls.append((name, count))
+    return name * count
+
+
+def remove(name: str, force: ty.Optional[bool] = False):
+    """Remove user
+
+    Args:
+        name: user's name
+        force: don't ask
+    """
+    calls.append((name, force))
+
+
+def lines(data: types.MappedFile):
+    """Count lines
+
+    Args:
+        data: a file
+    """
+    return sum(1 for _ in data)
+
+
+class TestBind(unittest.TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def factories(self):
+        return [ArgParserFactory(), FastParserFactory(), ArgParserFactory(ArgParserOptions(lazy_subparsers=True))]
+
+    def test_bind(self):
+        for factory in self.factories():
+            parser = factory.create([add, remove])
+            invocation = parser.bind(["add", "ab", "--count", "2"])
+
+            self.assertEqual("add", invocation.leaf.name)
+            self.assertEqual({"name": "ab", "count": 2}, invocation.arguments.arguments)
+            self.assertEqual((), invocation.errors)
+            self.assertEqual([], calls)
+
+            self.assertEqual("abab", invocation())
+            self.assertEqual("abab", invocation())
+            self.assertEqual([("ab", 2), ("ab", 2)], calls)
+            calls.clear()
+
+    def test_errors_and_help(self):
+        for factory in self.factories():
+            parser = factory.create([add, remove])
+
+            with mock.patch("sys.stdout") as stdout, mock.patch("sys.stderr") as stderr:
+                invalid = parser.bind(["add", "ab", "--count", "x"])
+                unknown = parser.bind(["qqq"])
+                help = parser.bind(["remove", "-h"])
+
+            stdout.write.assert_not_called()
+            stderr.write.assert_not_called()
+
+            self.assertIsNone(invalid.leaf)
+            self.assertIn("argument --count: invalid int value: 'x'", invalid.errors[0])
+            self.assertIn("invalid choice", unknown.errors[0])
+            self.assertEqual((), help.errors)
+            self.assertIn("don't ask", help.output)
+
+            with self.assertRaises(ValueError):
+                invalid()
+
+    def test_threads(self):
+        lines = [[["add", f"u{i}", "--count", str(i)], ["remove", f"u{i}", "--force"], ["add"]][i % 3]
+                 for i in range(300)]
+
+        for factory in self.factories():
+            parser = factory.create([add, remove])
+
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                invocations = list(executor.map(parser.bind, lines))
+
+            for args, invocation in zip(lines, invocations):
+                if len(args) == 1:
+                    self.assertIsNone(invocation.leaf)
+                    self.assertIn("the following arguments are required: name", invocation.errors[0])
+                else:
+                    self.assertEqual(args[0], invocation.leaf.name)
+                    self.assertEqual(args[1], invocation.arguments.arguments["name"])
+
+    def test_mapped_files(self):
+        path = os.path.abspath(__file__)
+
+        with open(path) as f:
+            expected = sum(1 for _ in f)
+
+        for factory in self.factories():
+            parser = factory.create(lines)
+
+            self.assertEqual(expected, parser.bind([path])())
+            self.assertIn("argument data: can't open 'missing.txt'", parser.bind(["missing.txt"]).errors[0])
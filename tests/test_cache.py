@@ -0,0 +1,126 @@
+import importlib
+import os
+import sys
+import tempfile
+import textwrap
+import typing as ty
+import unittest
+from unittest import mock
+
+import typedparse.spec as spec
+from typedparse.argparse import ArgParserFactory
+from typedparse.cache import SpecCache
+
+MODULE = '''
+import typing as ty
+
+
+class CLI:
+    """Command line interface"""
+
+    def __init__(self):
+        self.calls = []
+
+    def add(self, name: str, email: ty.Optional[str] = None):
+        """Add user
+
+        Args:
+            name: user's name
+            email: user's email
+        """
+        self.calls.append(("add", name, email))
+
+    def remove(self, name: str):
+        """Remove user
+
+        Args:
+            name: {desc}
+        """
+        self.calls.append(("remove", name))
+'''
+
+
+class TestSpecCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.module_name = f"cached_cli_{id(self)}"
+        self.module_path = os.path.join(self.tmp.name, f"{self.module_name}.py")
+        self.write_module("user's name")
+        sys.path.insert(0, self.tmp.name)
+        self.cache = SpecCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop(self.module_name, None)
+        self.tmp.cleanup()
+
+    def write_module(self, desc: str):
+        with open(self.module_path, "w") as f:
+            f.write(textwrap.dedent(MODULE.format(desc=desc)))
+
+    def load_module(self):
+        sys.modules.pop(self.module_name, None)
+        importlib.invalidate_caches()
+        return importlib.import_module(self.module_name)
+
+    def test_warm_start_skips_introspection(self):
+        module = self.load_module()
+        s1 = self.cache.create(module.CLI())
+
+        with mock.patch.object(spec, "create", side_effect=AssertionError("spec was rebuilt")):
+            cli = module.CLI()
+            s2 = self.cache.create(cli)
+
+        s2 = ty.cast(spec.ParserNode, s2)
+        self.assertEqual([c.name for c in s1.children], [c.name for c in s2.children])
+        self.assertEqual(spec.Argument(name="email", tpe="str", optional=True, default=None,
+                                       desc="user's email"), s2.children[0].get("email"))
+
+        ArgParserFactory().create(s2).parse(["add", "john", "--email", "john@example.com"])
+        self.assertEqual([("add", "john", "john@example.com")], cli.calls)
+
+    def test_classes_are_not_instantiated(self):
+        module = self.load_module()
+        self.cache.create(module.CLI)
+
+        with mock.patch.object(spec, "create", side_effect=AssertionError("spec was rebuilt")), \
+                mock.patch.object(module.CLI, "__init__", side_effect=AssertionError("instance was created")):
+            s = ty.cast(spec.ParserNode, self.cache.create(module.CLI))
+
+        ArgParserFactory().create(s).parse(["add", "john"])
+        self.assertEqual([("add", "john", None)], s.children[0].func.instance.get().calls)
+
+    def test_invalidation(self):
+        module = self.load_module()
+        self.cache.create(module.CLI())
+
+        self.write_module("name to remove")
+        st = os.stat(self.module_path)
+        os.utime(self.module_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        module = self.load_module()
+        s = ty.cast(spec.ParserNode, self.cache.create(module.CLI()))
+        self.assertEqual("name to remove", s.children[1].get("name").desc)
+
+    def test_size_cap(self):
+        module = self.load_module()
+        self.cache.max_size = 0
+        self.cache.create(module.CLI())
+        self.assertEqual([], os.listdir(self.cache.directory))
+
+    def test_uncacheable_spec(self):
+        def local_type(s: str) -> int:
+            return int(s)
+
+        def main(number: int):
+            """Test
+
+            Args:
+                number: a number
+            """
+
+        main.__options__ = {"number": {"type": local_type}}
+
+        s = ty.cast(spec.ParserLeaf, self.cache.create(main))
+        self.assertIs(main, s.func)
+        self.assertFalse(os.path.exists(self.cache.directory) and os.listdir(self.cache.directory))
@@ -0,0 +1,73 @@
+import enum
+import shutil
+import subprocess
+import typing as ty
+import unittest
+
+import typedparse.spec as spec
+from typedparse.argparse import ArgParserOptions
+from typedparse.completion import completion, fingerprint
+
+
+class Color(enum.Enum):
+    red = 1
+    green = 2
+
+
+class CLI(object):
+    def paint(self, color: Color, files: ty.List[ty.Literal["a", "b"]],
+              mode: ty.Optional[ty.Literal["fast", "slow"]] = None, verbose: ty.Optional[bool] = False):
+        """Paint
+
+        Args:
+            color: a color
+            files: files
+            mode: a mode
+            verbose: be verbose
+        """
+
+    def show(self, name: str):
+        """Show
+
+        Args:
+            name: a name
+        """
+
+
+class TestCompletion(unittest.TestCase):
+    def complete(self, script: str, *words: str) -> ty.List[str]:
+        words = " ".join(f"'{w}'" for w in words)
+        code = f'{script}\nCOMP_WORDS=(prog {words}); COMP_CWORD=$((${{#COMP_WORDS[@]}}-1))\n' \
+               f'_typedparse_prog; echo "${{COMPREPLY[*]}}"'
+        return subprocess.run(["bash", "-c", code], check=True, capture_output=True, text=True).stdout.split()
+
+    @unittest.skipUnless(shutil.which("bash"), "requires bash")
+    def test_bash(self):
+        script = completion(CLI(), "bash", "prog", ArgParserOptions(generate_short_flags=True))
+
+        self.assertEqual(["paint", "show"], self.complete(script, ""))
+        self.assertEqual(["show"], self.complete(script, "s"))
+        self.assertEqual(["red", "green"], self.complete(script, "paint", ""))
+        self.assertEqual(["a", "b"], self.complete(script, "paint", "red", ""))
+        self.assertEqual(["a", "b"], self.complete(script, "paint", "red", "a", ""))
+        self.assertEqual(["fast", "slow"], self.complete(script, "paint", "-m", ""))
+        self.assertEqual(["a", "b"], self.complete(script, "paint", "--mode", "fast", "red", ""))
+        self.assertEqual(["-h", "--help", "--mode", "-m", "--verbose", "-v"], self.complete(script, "paint", "-"))
+        self.assertEqual([], self.complete(script, "show", ""))
+
+    def test_fish(self):
+        script = completion(CLI(), "fish", "prog")
+
+        self.assertIn("complete -c prog -n '_typedparse_prog_is \"\"' -f -a paint -d Paint", script)
+        self.assertIn("complete -c prog -n '_typedparse_prog_is \"paint\"' -l mode -r -f -a 'fast slow' -d 'a mode'",
+                      script)
+
+    def test_fingerprint(self):
+        script = completion(CLI(), "zsh", "prog")
+
+        self.assertIn("bashcompinit", script)
+        self.assertEqual(64, len(fingerprint(script)))
+        self.assertIsNone(fingerprint(completion(spec.create(CLI()), "zsh", "prog")))
+
+        with self.assertRaises(ValueError):
+            completion(CLI(), "tcsh", "prog")
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import typing as ty
+import unittest
+
+import typedparse.spec as spec
+from typedparse import options
+from typedparse.argparse import ArgParserFactory, ArgParserOptions, _arguments
+from typedparse.dispatch import Command, ParallelError
+from typedparse.fast import FastParserFactory
+
+
+@options(items={"parallel": True})
+def square(items: ty.List[int], offset: ty.Optional[int] = 0):
+    """Square
+
+    Args:
+        items: numbers
+        offset: added to squares
+    """
+    if items < 0:
+        raise ValueError(f"negative {items}")
+
+    return items * items + offset, os.getpid()
+
+
+@options(items={"parallel": True})
+def record(items: ty.List[str], output: str):
+    """Record
+
+    Args:
+        items: words
+        output: file to append the words to
+    """
+    with open(output, "a") as f:
+        f.write(f"{items}\n")
+
+
+@options(items={"parallel": True, "chunked": True, "errors": "collect", "ordered": False})
+def total(items: ty.List[int]):
+    """Total
+
+    Args:
+        items: numbers
+    """
+    if any(item < 0 for item in items):
+        raise ValueError("negative")
+
+    return sum(items)
+
+
+class TestParallel(unittest.TestCase):
+    def test_flags(self):
+        flags = [flags for _, flags, _ in _arguments(ArgParserOptions(), spec.create(square))]
+        self.assertEqual([["items"], ["--offset"], ["--jobs"], ["--chunk-size"]], flags)
+
+    def test_command_line(self):
+        for factory in [ArgParserFactory(), FastParserFactory()]:
+            with tempfile.TemporaryDirectory() as directory:
+                output = os.path.join(directory, "output.txt")
+                factory.create(record).parse(["a", "b", "c", output, "--jobs", "2", "--chunk-size", "2"])
+
+                with open(output) as f:
+                    self.assertEqual(["a", "b", "c"], sorted(f.read().split()))
+
+    def test_per_item(self):
+        results = Command.from_leaf(spec.create(square))([[1, 2, 3, 4], 1, 2, 2])
+        self.assertEqual([2, 5, 10, 17], [value for value, _ in results])
+        self.assertNotIn(os.getpid(), [pid for _, pid in results])
+
+        with self.assertRaises(ValueError):
+            Command.from_leaf(spec.create(square))([[1, -2, 3], 0, 2, 1])
+
+    def test_chunks(self):
+        results = Command.from_leaf(spec.create(total))([list(range(10)), None, 3])
+        self.assertEqual([3, 9, 12, 21], sorted(results))
+
+        with self.assertRaises(ParallelError) as cm:
+            Command.from_leaf(spec.create(total))([[1, 2, -3, 4, 5], None, 2])
+
+        self.assertEqual([[-3, 4]], [item for item, _ in cm.exception.errors])
+        self.assertEqual([3, 5], sorted(cm.exception.results))
+
+    def test_invalid(self):
+        @options(jobs={"parallel": True})
+        def reserved(jobs: ty.List[int]):
+            """Test
+
+            Args:
+                jobs: jobs
+            """
+
+        @options(item={"parallel": True})
+        def scalar(item: int):
+            """Test
+
+            Args:
+                item: an item
+            """
+
+        for func in [reserved, scalar]:
+            with self.assertRaises(ValueError):
+                ArgParserFactory().create(func)
@@ -0,0 +1,145 @@
+import contextlib
+import io
+import typing as ty
+import unittest
+from pathlib import Path
+
+from typedparse import options
+from typedparse.argparse import ArgParserFactory, ArgParserOptions
+from typedparse.fast import FastParserFactory
+
+
+class CLI:
+    def __init__(self):
+        self.calls = []
+
+    @options(number=["-n", "--num"])
+    def head(self, file: Path, number: ty.Optional[int] = 10, verbose: ty.Optional[bool] = False,
+             quiet: ty.Optional[bool] = True):
+        """Display first lines
+
+        Args:
+            file: file to display
+            number: number of lines
+            verbose: verbose mode
+            quiet: quiet mode
+        """
+        self.calls.append(("head", file, number, verbose, quiet))
+
+    def sum(self, nums: ty.List[float], scale: ty.Optional[ty.Tuple[int, int]] = None,
+            tags: ty.Optional[ty.Set[str]] = None, mode: ty.Optional[ty.Literal["a", "b"]] = "a"):
+        """Sum numbers
+
+        Args:
+            nums: numbers
+            scale: scale
+            tags: tags
+            mode: mode
+        """
+        self.calls.append(("sum", nums, scale, tags, mode))
+
+    def copy(self, src: str, dst: str = "out", force: bool = False, level: ty.Optional[int] = None):
+        """Copy a file
+
+        Args:
+            src: source
+            dst: destination
+            force: force
+            level: level
+        """
+        self.calls.append(("copy", src, dst, force, level))
+
+
+COMMAND_LINES = [
+    ["head", "a.txt"],
+    ["head", "a.txt", "-n", "5"],
+    ["head", "--num", "5", "a.txt", "--verbose"],
+    ["head", "a.txt", "--num=7", "--quiet"],
+    ["head", "a.txt", "-n"],
+    ["head", "a.txt", "-n", "x"],
+    ["head", "a.txt", "--nu", "3"],
+    ["head", "a.txt", "-n", "-5"],
+    ["head"],
+    ["head", "-h"],
+    ["head", "a.txt", "b.txt"],
+    ["head", "a.txt", "--", "-n"],
+    ["sum", "1", "2.5", "-3"],
+    ["sum", "1", "--scale", "2", "3", "--tags", "x", "y", "x"],
+    ["sum", "--scale", "2", "3", "1"],
+    ["sum", "1", "--scale", "2"],
+    ["sum", "1", "--mode", "b"],
+    ["sum", "1", "--mode", "c"],
+    ["sum", "1", "--mode", "b", "--mode=x"],
+    ["sum", "1", "--mode", "x", "--mode", "b"],
+    ["copy", "a", "--level", "no", "--level", "2"],
+    ["copy", "a", "--level", "1", "--level", "2"],
+    ["sum"],
+    ["copy", "a"],
+    ["copy", "a", "b"],
+    ["copy", "a", "b", "yes", "--level", "3"],
+    ["copy", "--level", "3", "a", "b"],
+    ["copy", "a", "b", "maybe"],
+    ["copy", "a", "--level", "3", "b"],
+    ["copy", "a", "b", "t", "c"],
+    [],
+    ["qqq"],
+    ["-h"],
+]
+
+
+def run(factory, args: ty.List[str]) -> ty.Tuple[ty.List, ty.Any, str, str]:
+    cli = CLI()
+    parser = factory.create(cli)
+    stdout, stderr, code = io.StringIO(), io.StringIO(), None
+
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            parser.parse(args)
+        except SystemExit as e:
+            code = e.code
+
+    return cli.calls, code, stdout.getvalue(), stderr.getvalue()
+
+
+class TestFastParser(unittest.TestCase):
+    def test_same_as_argparse(self):
+        for opts in [ArgParserOptions(), ArgParserOptions(generate_short_flags=True)]:
+            for args in COMMAND_LINES:
+                with self.subTest(args=args, generate_short_flags=opts.generate_short_flags):
+                    self.assertEqual(run(ArgParserFactory(opts), args), run(FastParserFactory(opts), args))
+
+    def test_no_argparse_on_valid_command_lines(self):
+        cli = CLI()
+        parser = FastParserFactory().create(cli)
+
+        parser.parse(["head", "a.txt", "-n", "5", "--verbose"])
+        parser.parse(["sum", "1", "2", "--tags", "x"])
+
+        self.assertIsNone(parser._fallback)
+        self.assertEqual([("head", Path("a.txt"), 5, True, True), ("sum", [1.0, 2.0], None, {"x"}, "a")], cli.calls)
+
+    def test_converters_run_once(self):
+        converted = []
+
+        def opened(s: str) -> str:
+            converted.append(s)
+            return s
+
+        @options(names={"type": opened}, path={"type": opened})
+        def main(path: str, names: ty.Optional[ty.List[str]] = None):
+            """Main
+
+            Args:
+                path: a path
+                names: names
+            """
+
+        parser = FastParserFactory(ArgParserOptions(exit_on_error=False)).create(main)
+
+        self.assertEqual((), parser.bind(["a", "--names", "b", "c"]).errors)
+        self.assertEqual(["a", "b", "c"], converted)
+        converted.clear()
+
+        # the command line is delegated to argparse only after the unknown flag, the tokens are converted by it alone
+        self.assertTrue(parser.bind(["a", "--names", "b", "--unknown"]).errors)
+        self.assertEqual(["a", "b"], sorted(converted))
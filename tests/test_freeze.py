@@ -0,0 +1,63 @@
+import io
+import types
+import unittest
+from unittest import mock
+
+import examples.commands
+import typedparse.spec as spec
+from typedparse.argparse import ArgParserOptions
+from typedparse.freeze import freeze
+
+
+def load(source: str) -> types.ModuleType:
+    module = types.ModuleType("frozen_cli")
+    exec(compile(source, "frozen_cli.py", "exec"), module.__dict__)
+    return module
+
+
+def remove(self, name: str):
+    """Remove user from the database
+
+    Args:
+        name: user's name
+    """
+    return [{"name": name}]
+
+
+class TestFreeze(unittest.TestCase):
+    def test_frozen_parser(self):
+        frozen = load(freeze("examples.commands:CliExample"))
+
+        with mock.patch.object(spec, "create", side_effect=AssertionError("spec was built")), \
+                mock.patch.object(examples.commands.CliExample, "add") as add:
+            frozen.main(["add", "john", "--email", "john@mycompany.com"])
+
+        add.assert_called_once_with("john", "john@mycompany.com")
+
+    def test_fallback_on_changed_source(self):
+        frozen = load(freeze("examples.commands:CliExample"))
+        frozen.SOURCES["examples.commands"] = "0" * 64
+
+        with mock.patch.object(spec, "create", wraps=spec.create) as create:
+            frozen.main(["remove", "john"])
+
+        self.assertEqual(1, create.call_count)
+
+    def test_output(self):
+        source = freeze("examples.commands:CliExample", ArgParserOptions(output="jsonl"))
+
+        for changed in [False, True]:
+            frozen = load(source)
+
+            if changed:
+                frozen.SOURCES["examples.commands"] = "0" * 64
+
+            with mock.patch.object(examples.commands.CliExample, "remove", remove), \
+                    mock.patch("sys.stdout", io.StringIO()) as stdout:
+                frozen.main(["remove", "john"])
+
+            self.assertEqual('{"name": "john"}\n', stdout.getvalue())
+
+    def test_local_objects_are_not_frozen(self):
+        with self.assertRaises(ValueError):
+            freeze("tests.test_freeze:load")
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+import typing as ty
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestImports(unittest.TestCase):
+    def imported(self, *modules: str, module: str = "typedparse") -> ty.List[str]:
+        code = f"import sys, {module}; print(' '.join(m for m in {modules!r} if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], cwd=_ROOT, check=True, capture_output=True, text=True)
+        return result.stdout.split()
+
+    def test_optional_modules(self):
+        # modules of opt-in features are imported only when the features are used
+        self.assertEqual([], self.imported("asyncio", "importlib.metadata", "concurrent.futures", "typedparse.memo"))
+
+    def test_main(self):
+        # freeze and completion work on platforms without fcntl and Unix sockets
+        self.assertEqual([], self.imported("typedparse.server", "fcntl", module="typedparse.__main__"))
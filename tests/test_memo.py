@@ -0,0 +1,90 @@
+import enum
+import tempfile
+import types
+import typing as ty
+import unittest
+
+import typedparse.memo as memo
+import typedparse.types as tp
+from typedparse import options
+from typedparse.argparse import ArgParserFactory
+from typedparse.freeze import freeze
+
+calls = []
+
+
+def to_upper(s: str) -> str:
+    calls.append(s)
+    return s.upper()
+
+
+@options(names={"type": to_upper, "memoize": 2})
+def greet(names: ty.List[str]):
+    """Greet
+
+    Args:
+        names: names
+    """
+    calls.append(names)
+
+
+class First:
+    class Color(enum.Enum):
+        RED = 1
+
+
+class Second:
+    class Color(enum.Enum):
+        RED = 2
+
+
+class TestMemo(unittest.TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_lru(self):
+        converter = memo.MemoizedConverter(to_upper, max_size=2)
+
+        self.assertEqual(["A", "B", "A", "C", "B"], [converter(s) for s in "abacb"])
+        self.assertEqual(["a", "b", "c", "b"], calls)
+        self.assertEqual(memo.Stats("tests.test_memo:to_upper", 1, 4, 2), converter.stats())
+
+    def test_option(self):
+        ArgParserFactory().create(greet).parse(["x", "y", "x", "x", "y"])
+        ArgParserFactory().create(greet).parse(["x"])
+
+        self.assertEqual(["x", "y", ["X", "Y", "X", "X", "Y"], ["X"]], calls)
+        self.assertIs(memo.memoize(to_upper, 2), memo.memoize(to_upper, 2))
+        self.assertIn(memo.memoize(to_upper, 2).stats(), memo.stats())
+
+    def test_persist(self):
+        with tempfile.TemporaryDirectory() as directory:
+            converter = memo.MemoizedConverter(to_upper, persist=True, directory=directory)
+            self.assertEqual("A", converter("a"))
+            converter.save()
+
+            converter = memo.MemoizedConverter(to_upper, persist=True, directory=directory)
+            self.assertEqual("A", converter("a"))
+            self.assertEqual(["a"], calls)
+            self.assertEqual(1, converter.stats().hits)
+
+    def test_persist_converter_objects(self):
+        # converters of enumerations with the same name are stored separately
+        with tempfile.TemporaryDirectory() as directory:
+            for color in [First.Color, Second.Color]:
+                converter = memo.MemoizedConverter(tp.EnumConverter(color), persist=True, directory=directory)
+                self.assertIs(color.RED, converter("RED"))
+                converter.save()
+
+            converter = memo.MemoizedConverter(tp.UnionConverter([int, tp.EnumConverter(First.Color)]), persist=True,
+                                               directory=directory)
+            self.assertIs(First.Color.RED, converter("RED"))
+            self.assertIn("(builtins:int, typedparse.types:EnumConverter(tests.test_memo:First.Color))",
+                          converter.stats().name)
+
+    def test_freeze(self):
+        frozen = types.ModuleType("frozen_cli")
+        exec(compile(freeze("tests.test_memo:greet"), "frozen_cli.py", "exec"), frozen.__dict__)
+        frozen.main(["q", "q"])
+
+        self.assertEqual(["q", ["Q", "Q"]], calls)
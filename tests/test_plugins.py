@@ -0,0 +1,90 @@
+import importlib
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+import typedparse.plugins as plugins
+from typedparse.argparse import ArgParserFactory
+
+MODULE = '''
+calls = []
+
+
+def greet(name: str):
+    """Greet somebody
+
+    Args:
+        name: a name
+    """
+    calls.append(name)
+
+
+class Users:
+    """Manage users"""
+
+    def add(self, name: str):
+        """Add user
+
+        Args:
+            name: user's name
+        """
+'''
+
+
+class TestPlugins(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.module = f"plugin_cmds_{id(self)}"
+        self.group = f"typedparse_tests_{id(self)}"
+
+        with open(os.path.join(self.tmp.name, f"{self.module}.py"), "w") as f:
+            f.write(textwrap.dedent(MODULE))
+
+        self.add_distribution("first", {"greet": f"{self.module}:greet", "broken": self.module})
+        sys.path.insert(0, self.tmp.name)
+        importlib.invalidate_caches()
+        self.index = plugins.PluginIndex(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop(self.module, None)
+        self.tmp.cleanup()
+
+    def add_distribution(self, name: str, entry_points: dict):
+        info = os.path.join(self.tmp.name, f"{name}-1.0.dist-info")
+        os.makedirs(info)
+
+        with open(os.path.join(info, "METADATA"), "w") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+
+        with open(os.path.join(info, "entry_points.txt"), "w") as f:
+            f.write(f"[{self.group}]\n" + "".join(f"{k} = {v}\n" for k, v in entry_points.items()))
+
+        st = os.stat(self.tmp.name)
+        os.utime(self.tmp.name, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_discover(self):
+        node = plugins.discover(self.group, index=self.index)
+
+        self.assertEqual([("greet", "Greet somebody")], [(c.name, c.desc) for c in node.children])
+        self.assertNotIn(self.module, sys.modules)
+
+        ArgParserFactory().create(node).parse(["greet", "john"])
+        self.assertEqual(["john"], sys.modules[self.module].calls)
+
+    def test_index(self):
+        plugins.discover(self.group, index=self.index)
+
+        with mock.patch.object(plugins, "_entry_points", side_effect=AssertionError("entry points were scanned")):
+            node = plugins.discover(self.group, index=self.index)
+
+        self.assertEqual(["greet"], [c.name for c in node.children])
+
+        self.add_distribution("second", {"users": f"{self.module}:Users"})
+        node = plugins.discover(self.group, index=self.index)
+
+        self.assertEqual([("greet", "Greet somebody"), ("users", "Manage users")],
+                         [(c.name, c.desc) for c in node.children])
@@ -0,0 +1,81 @@
+import threading
+import typing as ty
+import unittest
+from unittest import mock
+
+import typedparse
+import typedparse.profile as profile
+
+
+class TestProfile(unittest.TestCase):
+    def test_phases(self):
+        calls = []
+        profilers = []
+
+        def main(number: int, name: ty.Optional[str] = None):
+            """Test
+
+            Args:
+                number: a number
+                name: a name
+            """
+            calls.append((number, name))
+
+        for fast in [False, True]:
+            with mock.patch("sys.argv", ["main", "10", "--name", "x"]):
+                typedparse.parse(main, fast=fast, profile=profilers.append)
+
+            records = profilers[-1].records
+            self.assertEqual({("spec", None), ("docstring", "main"), ("build", None), ("argv", None),
+                              ("convert", "main.number"), ("convert", "main.name"), ("dispatch", "main")},
+                             set(records))
+            self.assertEqual(1, records[("dispatch", "main")].calls)
+            self.assertIn("dispatch", profilers[-1].report())
+
+        self.assertEqual([(10, "x"), (10, "x")], calls)
+
+    def test_disabled(self):
+        self.assertIs(profile.phase("spec"), profile.phase("build"))
+
+        func = str
+        self.assertIs(func, profile.wrap(func, "convert"))
+
+    def test_nested_phases(self):
+        profiler = profile.Profiler()
+
+        with profile.profiling(profiler):
+            with profile.phase("spec"):
+                with profile.phase("spec"):
+                    pass
+
+        self.assertEqual(1, profiler.records[("spec", None)].calls)
+
+    def test_threads(self):
+        profilers = [profile.Profiler(), profile.Profiler()]
+        entered = threading.Barrier(2)
+        first_done = threading.Event()
+
+        def run(index: int):
+            with profile.profiling(profilers[index]):
+                entered.wait()
+
+                # the first thread leaves its context while the second one is still profiling
+                if index == 1:
+                    first_done.wait()
+
+                with profile.phase("argv", str(index)):
+                    pass
+
+            if index == 0:
+                first_done.set()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([{("argv", "0")}, {("argv", "1")}], [set(p.records) for p in profilers])
+        self.assertIs(profile.phase("spec"), profile.phase("build"))
@@ -0,0 +1,141 @@
+import os
+import signal
+import socket
+import stat
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from unittest import mock
+
+import typedparse.server as server
+
+_SOURCE = '''\
+import os
+import sys
+
+
+def greet(name: str, code: int = 0):
+    """Greet
+
+    Args:
+        name: a name
+        code: exit status
+    """
+    print("{greeting}", name, os.getcwd(), os.environ.get("GREETING_SUFFIX"), os.getpid())
+    sys.exit(code)
+
+
+class Tool:
+    def __init__(self):
+        self.pid = os.getpid()
+
+    def pids(self):
+        """Print the process which created the instance and the current one"""
+        print(self.pid, os.getpid())
+'''
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.module = os.path.join(self.directory.name, "greeting_cli.py")
+        self.address = os.path.join(self.directory.name, "server.sock")
+        self.write("hello")
+
+        path = os.pathsep.join([self.directory.name, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))])
+        patcher = mock.patch.dict("os.environ", {"PYTHONPATH": path, "GREETING_SUFFIX": "!"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.stop)
+
+    def write(self, greeting: str):
+        with open(self.module, "w") as f:
+            f.write(textwrap.dedent(_SOURCE.format(greeting=greeting)))
+
+    def stop(self):
+        with open(f"{self.address}.lock") as f:
+            pid = f.read()
+
+        if pid:
+            os.kill(int(pid), signal.SIGTERM)
+
+    def call(self, *args: str, target: str = "greeting_cli:greet") -> (int, str):
+        with tempfile.TemporaryFile("w+") as output:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            saved = [os.dup(1), os.dup(2)]
+            os.dup2(output.fileno(), 1)
+            os.dup2(output.fileno(), 2)
+
+            try:
+                status = server.call(target, list(args), self.address)
+            finally:
+                for fd, copy in enumerate(saved, start=1):
+                    os.dup2(copy, fd)
+                    os.close(copy)
+
+            output.seek(0)
+            return status, output.read()
+
+    def test_call(self):
+        status, output = self.call("world")
+        greeting, name, cwd, suffix, pid = output.split()
+        self.assertEqual((0, "hello", "world", os.getcwd(), "!"), (status, greeting, name, cwd, suffix))
+
+        status, output = self.call("again", "3")
+        self.assertEqual(3, status)
+        self.assertNotEqual(pid, output.split()[-1])
+
+        status, output = self.call("--unknown")
+        self.assertEqual(2, status)
+        self.assertIn("error: the following arguments are required: name", output)
+
+    def test_restart(self):
+        self.assertEqual("hello", self.call("world")[1].split()[0])
+
+        time.sleep(0.01)
+        self.write("hi")
+        self.assertEqual("hi", self.call("world")[1].split()[0])
+
+    def test_classes(self):
+        # each child creates its own instance, so resources opened by __init__ aren't shared by the children
+        created, current = self.call("pids", target="greeting_cli:Tool")[1].split()
+        self.assertEqual(created, current)
+
+    def test_restart_refs(self):
+        with open(os.path.join(self.directory.name, "greeting_refs.py"), "w") as f:
+            # the referenced module is imported by the server, e.g. by its package, and must be watched as well
+            f.write('import greeting_cli\n\ncommands = ["greeting_cli:greet"]\n')
+
+        self.assertEqual("hello", self.call("greet", "world", target="greeting_refs:commands")[1].split()[0])
+
+        time.sleep(0.01)
+        self.write("hi")
+        self.assertEqual("hi", self.call("greet", "world", target="greeting_refs:commands")[1].split()[0])
+
+    def test_permissions(self):
+        with mock.patch.dict("os.environ", {"XDG_RUNTIME_DIR": ""}), \
+                mock.patch("tempfile.gettempdir", return_value=self.directory.name):
+            directory = os.path.dirname(server.default_address("greeting_cli:greet"))
+            self.assertEqual(0o700, stat.S_IMODE(os.stat(directory).st_mode))
+
+            os.chmod(directory, 0o755)
+
+            with self.assertRaises(PermissionError):
+                server.default_address("greeting_cli:greet")
+
+        self.call("world")
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.address).st_mode))
+
+        left, right = socket.socketpair()
+
+        with left, right:
+            self.assertIn(server._peer_uid(left), (None, os.getuid()))
+
+        with mock.patch.object(server, "_peer_uid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                self.call("world")
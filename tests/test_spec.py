@@ -1,5 +1,6 @@
 import typing as ty
 import unittest
+from unittest import mock
 
 import typedparse.spec as spec
 from typedparse import options
@@ -160,3 +161,48 @@ class TestParserSpec(unittest.TestCase):
 
         self.assertEqual(spec.Argument(name="number", tpe="int", optional=True,
                                        default=0, desc="number of lines", options="n"), s.get("number"))
+
+    def test_refs(self):
+        s = spec.create(["examples.head:main", spec.ParserRef("examples.commands:CliExample", desc="Manage users")])
+        s = ty.cast(spec.ParserNode, s)
+
+        self.assertEqual(["main", "cliexample"], [c.name for c in s.children])
+        self.assertTrue(all(isinstance(c, spec.ParserRef) for c in s.children))
+
+        head = ty.cast(spec.ParserLeaf, s.children[0].resolve())
+        self.assertEqual("Display first lines of a file.", head.desc)
+        self.assertEqual("file to display", head.get("file").desc)
+
+        commands = ty.cast(spec.ParserNode, s.children[1].resolve())
+        self.assertEqual("Manage users", commands.desc)
+        self.assertEqual(["add", "remove"], [c.name for c in commands.children])
+
+        with self.assertRaises(ValueError):
+            spec.ParserRef("examples.head")
+
+    def test_lazy_docs(self):
+        def undocumented(name: str, count: ty.Optional[int] = 1):
+            """Show
+
+            Args:
+                name: a name
+            """
+
+        with mock.patch.object(spec, "parse", wraps=spec.parse) as parse:
+            s = ty.cast(spec.ParserLeaf, spec.create(undocumented, lazy_docs=True))
+            parse.assert_not_called()
+
+            self.assertIsNone(s.get("name").desc)
+            self.assertEqual("Show", s.get_desc())
+            self.assertEqual("a name", s.get("name").get_desc())
+            self.assertIsNone(s.get("count").get_desc())
+            parse.assert_called_once()
+
+        with self.assertRaises(ValueError):
+            spec.create(undocumented)
+
+        with self.assertRaises(ValueError) as cm:
+            spec.check([undocumented])
+
+        self.assertEqual("Invalid docstring of 'undocumented': Missing description of 'count'", str(cm.exception))
+        spec.check(["examples.head:main", "examples.commands:CliExample"])
@@ -0,0 +1,82 @@
+import typing as ty
+import unittest
+
+from typedparse import options
+from typedparse.argparse import ArgParserError, ArgParserFactory, ArgParserOptions
+from typedparse.fast import FastParserFactory
+from typedparse.trie import PrefixTrie
+
+
+@options(count="-c")
+def add(name: str, count: ty.Optional[int] = 1, color: ty.Optional[str] = None, offset: ty.Optional[int] = 0):
+    """Add
+
+    Args:
+        name: a name
+        count: a count
+        color: a color
+        offset: an offset
+    """
+    return name, count, color, offset
+
+
+def alias(name: str):
+    """Alias
+
+    Args:
+        name: a name
+    """
+    return name
+
+
+def remove(name: str):
+    """Remove
+
+    Args:
+        name: a name
+    """
+    return name
+
+
+class TestPrefixTrie(unittest.TestCase):
+    def test_complete(self):
+        t = PrefixTrie(["--count", "--color", "-c", "--offset"])
+        t.add("--count")
+
+        self.assertEqual(4, len(t))
+        self.assertIn("--count", t)
+        self.assertNotIn("--co", t)
+        self.assertEqual(["--count"], t.complete("--cou"))
+        self.assertEqual(["--count", "--color"], t.complete("--co"))
+        self.assertEqual(["--count", "--color", "--offset"], t.complete("--"))
+        self.assertEqual([], t.complete("--x"))
+
+
+class TestAbbreviations(unittest.TestCase):
+    def factories(self, **kwargs):
+        opts = ArgParserOptions(exit_on_error=False, **kwargs)
+        return [ArgParserFactory(opts), FastParserFactory(opts)]
+
+    def test_flags(self):
+        for factory in self.factories():
+            parser = factory.create([add, alias, remove])
+
+            self.assertEqual(("a", 2, "red", -5), parser.bind(["add", "a", "--cou", "2", "--col=red", "--off", "-5"])())
+            self.assertEqual(("-5", 3, None, 0), parser.bind(["add", "-c3", "-5"])())
+            self.assertIn("ambiguous option: --co could match --count, --color",
+                          parser.bind(["add", "a", "--co", "2"]).errors[0])
+
+        for factory in self.factories(allow_abbrev=False):
+            parser = factory.create([add, alias, remove])
+            self.assertIn("unrecognized arguments: --cou", parser.bind(["add", "a", "--cou", "2"]).errors[0])
+
+    def test_commands(self):
+        for factory in self.factories(abbrev_commands=True):
+            parser = factory.create([add, alias, remove])
+
+            self.assertEqual("b", parser.bind(["rem", "b"])())
+            self.assertEqual("b", parser.bind(["ali", "b"])())
+            self.assertIn("ambiguous choice: 'a' could match add, alias", parser.bind(["a", "b"]).errors[0])
+
+        with self.assertRaises(ArgParserError):
+            ArgParserFactory(ArgParserOptions(exit_on_error=False)).create([add, alias, remove]).parse(["rem", "b"])
@@ -0,0 +1,193 @@
+import argparse
+import array
+import enum
+import importlib.util
+import io
+import os
+import tempfile
+import typing as ty
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import typedparse.types as types
+
+
+class Color(enum.Enum):
+    RED = 1
+    GREEN = 2
+
+
+class TestTypes(unittest.TestCase):
+    def test_scalars(self):
+        info = types.resolve(int)
+        self.assertEqual("int", info.name)
+        self.assertFalse(info.optional)
+        self.assertIs(int, info.converter)
+        self.assertIsNone(info.container)
+
+        info = types.resolve(ty.Optional[Path])
+        self.assertEqual("pathlib.Path", info.name)
+        self.assertTrue(info.optional)
+        self.assertEqual(Path("a.txt"), info.converter("a.txt"))
+
+        info = types.resolve(bool)
+        self.assertTrue(info.is_bool)
+        self.assertFalse(info.converter("no"))
+
+    def test_containers(self):
+        info = types.resolve(ty.Optional[ty.List[int]])
+        self.assertEqual("typing.List[int]", info.name)
+        self.assertTrue(info.optional)
+        self.assertIs(list, info.container)
+        self.assertIs(int, info.tpe)
+
+        info = types.resolve(ty.Tuple[float, float])
+        self.assertEqual(2, info.nargs)
+        self.assertEqual((1.0, 2.0), info.finalize([1.0, 2.0]))
+
+        info = types.resolve(ty.Tuple[str, ...])
+        self.assertIsNone(info.nargs)
+        self.assertEqual("typing.Tuple[str, ...]", info.name)
+
+        info = types.resolve(ty.Set[str])
+        self.assertEqual({"a", "b"}, info.finalize(["a", "b", "a"]))
+
+        with self.assertRaises(ValueError):
+            types.resolve(ty.Tuple[int, str])
+
+    def test_choices(self):
+        info = types.resolve(ty.Literal["fast", "slow"])
+        self.assertEqual(("fast", "slow"), info.choices)
+        self.assertIs(str, info.converter)
+
+        info = types.resolve(ty.Optional[Color])
+        self.assertTrue(info.optional)
+        self.assertEqual((Color.RED, Color.GREEN), info.choices)
+        self.assertEqual(Color.GREEN, info.converter("GREEN"))
+
+        with self.assertRaises(ValueError):
+            info.converter("BLUE")
+
+    def test_union(self):
+        info = types.resolve(ty.Union[int, str])
+        self.assertEqual("typing.Union[int, str]", info.name)
+        self.assertFalse(info.optional)
+        self.assertEqual(10, info.converter("10"))
+        self.assertEqual("ten", info.converter("ten"))
+
+        info = types.resolve(ty.Optional[ty.Union[int, float]])
+        self.assertTrue(info.optional)
+        self.assertEqual(1.5, info.converter("1.5"))
+
+        # equal annotations with other orders of types are resolved separately
+        self.assertEqual(5, types.resolve(ty.Union[int, str]).converter("5"))
+        self.assertEqual("5", types.resolve(ty.Union[str, int]).converter("5"))
+        self.assertEqual("5", types.resolve(ty.Union[str, int, None]).converter("5"))
+        self.assertEqual(("a", "b"), types.resolve(ty.Literal["a", "b"]).choices)
+        self.assertEqual(("b", "a"), types.resolve(ty.Literal["b", "a"]).choices)
+
+    def test_local_class(self):
+        class Local:
+            def __init__(self, s: str):
+                self.s = s
+
+        info = types.resolve(Local)
+        self.assertTrue(info.name.endswith("test_local_class.<locals>.Local"))
+        self.assertEqual("x", info.converter("x").s)
+
+    def test_streams(self):
+        info = types.resolve(ty.Iterator[int])
+        self.assertEqual("typing.Iterator[int]", info.name)
+        self.assertTrue(info.stream)
+        self.assertIsNone(info.container)
+
+        self.assertEqual("typing.Iterable[str]", types.resolve(ty.Optional[ty.Iterable]).name)
+
+        tokens = types.tokens(io.StringIO("1 22\n\n 333  4444\n"), size=3)
+        self.assertEqual(["1", "22", "333", "4444"], list(tokens))
+
+        tokens = types.tokens(io.StringIO("a b\nc\n\nd"), "\n", size=2)
+        self.assertEqual(["a b", "c", "d"], list(tokens))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "items.txt")
+
+            with open(path, "w") as f:
+                f.write("RED GREEN\nRED")
+
+            items = types.resolve(ty.Iterator[Color]).converter(path)
+            self.assertEqual(Color.RED, next(items))
+            self.assertEqual([Color.GREEN, Color.RED], list(items))
+
+            with mock.patch("sys.stdin", io.StringIO("1 2")):
+                self.assertEqual([1, 2], list(info.converter("-")))
+
+            with self.assertRaises(argparse.ArgumentTypeError):
+                info.converter(os.path.join(directory, "missing.txt"))
+
+            with self.assertRaises(ValueError):
+                list(types.resolve(ty.Iterator[ty.Literal["a"]]).converter(path))
+
+    def test_mapped_files(self):
+        self.assertEqual("typedparse.types.MappedFile", types.resolve(ty.Optional[types.MappedFile]).name)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lines.txt")
+            empty = os.path.join(directory, "empty.txt")
+
+            with open(path, "wb") as f:
+                f.write("a\nб\r\n\nlast".encode())
+
+            open(empty, "w").close()
+
+            with types.resolve(types.MappedBytes).converter(path) as data:
+                self.assertEqual(11, len(data))
+                self.assertEqual([b"a\n", "б\r\n".encode(), b"\n", b"last"], list(data))
+                self.assertEqual(b"last", data.mmap[-4:])
+
+                with data.view as view:
+                    self.assertTrue(view.readonly)
+                    self.assertEqual(b"a\n", view[:2].tobytes())
+
+            with types.MappedFile(path) as data:
+                self.assertEqual(["a\n", "б\r\n", "\n", "last"], list(data.lines()))
+
+            with types.MappedFile(empty) as data:
+                self.assertEqual(0, len(data))
+                self.assertEqual([], list(data))
+                self.assertEqual(b"", data.view.tobytes())
+
+            for source in [os.path.join(directory, "missing.txt"), directory]:
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    types.MappedFile(source)
+
+    def test_arrays(self):
+        converter = types.ArrayConverter(int, min=0, max=10)
+        values = converter(["1", "10", "0"])
+        self.assertEqual(array.array("q", [1, 10, 0]), values)
+        self.assertIsNone(converter(None))
+
+        self.assertEqual(array.array("d", [0.5]), types.ArrayConverter(float)(["0.5"]))
+
+        for tokens in [["1", "x"], ["-1"], ["11"], [str(2 ** 64)]]:
+            with self.assertRaises(ValueError):
+                converter(tokens)
+
+        with self.assertRaises(ValueError):
+            types.ArrayConverter(str)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "requires numpy")
+    def test_numpy_arrays(self):
+        import numpy
+        import numpy.typing
+
+        info = types.resolve(numpy.typing.NDArray[numpy.int32])
+        self.assertEqual("numpy.ndarray[int32]", info.name)
+        self.assertIs(numpy.ndarray, info.container)
+
+        values = info.finalize(["1", "2"])
+        self.assertEqual(numpy.int32, values.dtype)
+        self.assertEqual([1, 2], values.tolist())
+
+        self.assertEqual(numpy.float64, types.resolve(ty.Optional[numpy.ndarray]).finalize(["1"]).dtype)
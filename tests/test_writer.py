@@ -0,0 +1,115 @@
+import io
+import typing as ty
+import unittest
+from unittest import mock
+
+import typedparse.writer as writer
+from typedparse.argparse import ArgParserFactory, ArgParserOptions
+from typedparse.fast import FastParserFactory
+
+produced = []
+
+
+def users(count: int, prefix: ty.Optional[str] = "u"):
+    """List users
+
+    Args:
+        count: number of users
+        prefix: prefix of names
+    """
+    for i in range(count):
+        produced.append(i)
+        yield {"id": i, "name": f"{prefix}{i}"}
+
+
+class _Stream(io.StringIO):
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+        self.writes = []
+        self.flushes = 0
+
+    def write(self, s: str) -> int:
+        if self.fail:
+            raise BrokenPipeError()
+
+        self.writes.append(s)
+        return super().write(s)
+
+    def flush(self):
+        self.flushes += 1
+
+
+class TestWriter(unittest.TestCase):
+    def setUp(self):
+        produced.clear()
+
+    def test_formats(self):
+        items = [{"a": 1, "b": "x\ty"}, ("c", None), "d"]
+        expected = {
+            "lines": "{'a': 1, 'b': 'x\\ty'}\n('c', None)\nd\n",
+            "jsonl": '{"a": 1, "b": "x\\ty"}\n["c", null]\n"d"\n',
+            "tsv": "1\tx\\ty\nc\tNone\nd\n"
+        }
+
+        for fmt in writer.FORMATS:
+            stream = _Stream()
+            writer.write(iter(items), fmt, stream=stream)
+            self.assertEqual(expected[fmt], stream.getvalue())
+
+        stream = _Stream()
+        writer.write("abc", "lines", stream=stream)
+        writer.write(None, "lines", stream=stream)
+        self.assertEqual("abc\n", stream.getvalue())
+
+        with self.assertRaises(ValueError):
+            ArgParserOptions(output="csv")
+
+    def test_buffering(self):
+        stream = _Stream()
+        writer.write(range(10), "lines", stream=stream, buffer_size=8)
+        self.assertEqual(["0\n1\n2\n3\n", "4\n5\n6\n7\n", "8\n9\n"], stream.writes)
+        self.assertEqual(1, stream.flushes)
+
+        stream = _Stream()
+        writer.write(range(10), "lines", flush=3, stream=stream)
+        self.assertEqual(["0\n1\n2\n", "3\n4\n5\n", "6\n7\n8\n", "9\n"], stream.writes)
+        self.assertEqual(4, stream.flushes)
+
+        def failing():
+            yield 1
+            raise RuntimeError("failed")
+
+        stream = _Stream()
+
+        with self.assertRaises(RuntimeError):
+            writer.write(failing(), "lines", stream=stream)
+
+        self.assertEqual("1\n", stream.getvalue())
+
+    def test_broken_pipe(self):
+        items = users(1000)
+
+        with self.assertRaises(SystemExit) as e:
+            writer.write(items, "jsonl", stream=_Stream(fail=True), buffer_size=64)
+
+        self.assertEqual(1, e.exception.code)
+        self.assertLess(len(produced), 1000)
+        self.assertEqual([], list(items))
+
+    def test_parse(self):
+        options = ArgParserOptions(output="tsv", output_flush=2)
+
+        for factory in [ArgParserFactory(options), FastParserFactory(options)]:
+            stream = _Stream()
+
+            with mock.patch("sys.stdout", stream):
+                factory.create(users).parse(["3", "--prefix", "x"])
+
+            self.assertEqual("0\tx0\n1\tx1\n2\tx2\n", stream.getvalue())
+            self.assertEqual(2, stream.flushes)
+
+        with mock.patch("sys.stdout", _Stream()) as stream:
+            ArgParserFactory().create(users).parse(["3"])
+
+        self.assertEqual("", stream.getvalue())
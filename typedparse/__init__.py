@@ -1,7 +1,18 @@
+import os
 import typing as ty
 from functools import wraps
 
-from typedparse.argparse import ArgParserFactory, ArgParserOptions
+from typedparse.argparse import ArgParserError, ArgParserExit, ArgParserFactory, ArgParserOptions
+from typedparse.batch import BatchSummary, run_batch
+from typedparse.cache import SpecCache
+from typedparse.dispatch import Invocation
+from typedparse.fast import FastParserFactory
+from typedparse.plugins import PluginIndex, discover
+from typedparse.profile import ENV_VAR as PROFILE_ENV_VAR, Profiler, print_report, profiling
+from typedparse.spec import ParserRef, check
+
+if ty.TYPE_CHECKING:
+    import asyncio
 
 
 def options(**kw):
@@ -17,15 +28,85 @@ def options(**kw):
     return decorator
 
 
-def parse(obj: ty.Any, generate_short_flags: bool = False, snake_case_flags: bool = False):
+def command(target: str, name: ty.Optional[str] = None, desc: ty.Optional[str] = None) -> ParserRef:
+    """Refer to a command which is imported only when it is invoked.
+
+    Args:
+        target: Reference to a function or a class in the form 'module:attribute'.
+        name: Name of the command, by default it is derived from the attribute.
+        desc: Short description of the command shown in the list of commands.
+    """
+    return ParserRef(target, name, desc)
+
+
+def parse(obj: ty.Any, generate_short_flags: bool = False, snake_case_flags: bool = False,
+          cache: ty.Union[bool, SpecCache] = False, lazy_subparsers: bool = False, fast: bool = False,
+          profile: ty.Optional[ty.Callable[[Profiler], ty.Any]] = None,
+          loop: ty.Optional["asyncio.AbstractEventLoop"] = None,
+          batch: ty.Union[None, str, ty.TextIO] = None, lazy_docs: bool = False, allow_abbrev: bool = True,
+          abbrev_commands: bool = False, output: ty.Optional[str] = None,
+          output_flush: ty.Optional[int] = None) -> ty.Optional[BatchSummary]:
     """Parse command line arguments by specification.
 
     Args:
         obj: An object which specifies a mapping of the arguments. It can be a function, a class, an object or a list.
         generate_short_flags: Generate short flags for all optional formal parameters, false by default.
         snake_case_flags: Use snake case instead of kebab case for long flags, false default.
+        cache: Cache the specification on disk, it can be true to use the default cache or an instance of SpecCache.
+        lazy_subparsers: Build subparsers only when they are selected on the command line, false by default.
+        fast: Bind arguments without argparse whenever possible, false by default.
+        profile: A callback which receives the Profiler with the cost of each phase after the invocation. If it's not
+            set but the TYPEDPARSE_PROFILE environment variable is, the report is printed to stderr.
+        loop: An event loop to run async commands, a new event loop is created for each invocation by default.
+        batch: A stream or a path of a file with one command line per line. If it's set, the parser is built once and
+            all the command lines are run with it, errors are reported per line. Returns the summary of the batch.
+        lazy_docs: Parse docstrings only when help is shown, false by default. Docstrings are not validated in this
+            case, use `typedparse.check` in tests instead.
+        allow_abbrev: Accept unique prefixes of long flags, true by default.
+        abbrev_commands: Accept unique prefixes of names of commands, false by default.
+        output: Write the return value of the command to stdout in the format 'lines', 'jsonl' or 'tsv', items of
+            iterables and generators are streamed one by one. Return values are ignored by default.
+        output_flush: Flush the output after every `output_flush` items, by default only when the buffer is full.
     """
-    return ArgParserFactory(ArgParserOptions(
-        generate_short_flags=generate_short_flags,
-        snake_case_flags=snake_case_flags
-    )).create(obj).parse()
+    def run():
+        target = obj
+
+        if cache:
+            target = (cache if isinstance(cache, SpecCache) else SpecCache()).create(target)
+
+        options = ArgParserOptions(
+            generate_short_flags=generate_short_flags,
+            snake_case_flags=snake_case_flags,
+            lazy_subparsers=lazy_subparsers,
+            loop=loop,
+            exit_on_error=batch is None,
+            lazy_docs=lazy_docs,
+            allow_abbrev=allow_abbrev,
+            abbrev_commands=abbrev_commands,
+            output=output,
+            output_flush=output_flush
+        )
+
+        factory = FastParserFactory(options) if fast else ArgParserFactory(options)
+        parser = factory.create(target)
+
+        if batch is None:
+            return parser.parse()
+        elif isinstance(batch, str):
+            with open(batch) as f:
+                return run_batch(parser, f)
+        else:
+            return run_batch(parser, batch)
+
+    callback = profile or (print_report if os.environ.get(PROFILE_ENV_VAR) else None)
+
+    if callback is None:
+        return run()
+
+    profiler = Profiler()
+
+    try:
+        with profiling(profiler):
+            return run()
+    finally:
+        callback(profiler)
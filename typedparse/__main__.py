@@ -0,0 +1,81 @@
+import os
+import sys
+import typing as ty
+
+import typedparse
+import typedparse.spec as spec
+from typedparse.argparse import ArgParserOptions
+from typedparse.completion import completion as completion_script
+from typedparse.freeze import freeze as freeze_target
+
+
+def freeze(target: str, output: ty.Optional[str] = None, generate_short_flags: ty.Optional[bool] = False,
+           snake_case_flags: ty.Optional[bool] = False):
+    """Generate a standalone module with a prebuilt parser
+
+    Args:
+        target: reference to the object passed to typedparse.parse in the form 'module:attribute'
+        output: file to write the module to, stdout by default
+        generate_short_flags: the same as in typedparse.parse
+        snake_case_flags: the same as in typedparse.parse
+    """
+    source = freeze_target(target, ArgParserOptions(generate_short_flags=generate_short_flags,
+                                                    snake_case_flags=snake_case_flags))
+
+    if output:
+        with open(output, "w") as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+def completion(target: str, shell: str, prog: ty.Optional[str] = None, output: ty.Optional[str] = None,
+               generate_short_flags: ty.Optional[bool] = False, snake_case_flags: ty.Optional[bool] = False):
+    """Generate a static shell completion script
+
+    Args:
+        target: reference to the object passed to typedparse.parse in the form 'module:attribute'
+        shell: bash, zsh or fish
+        prog: name of the program, the module of the target by default
+        output: file to write the script to, stdout by default, it's not rewritten if the script is the same
+        generate_short_flags: the same as in typedparse.parse
+        snake_case_flags: the same as in typedparse.parse
+    """
+    obj = spec.import_target(target)
+    options = ArgParserOptions(generate_short_flags=generate_short_flags, snake_case_flags=snake_case_flags)
+    script = completion_script(obj, shell, prog or target.split(":")[0].split(".")[-1], options)
+
+    if output:
+        if os.path.exists(output):
+            with open(output) as f:
+                previous = f.read()
+
+            if previous == script:
+                return
+
+        with open(output, "w") as f:
+            f.write(script)
+    else:
+        sys.stdout.write(script)
+
+
+def serve(target: str, address: ty.Optional[str] = None, fast: ty.Optional[bool] = False,
+          generate_short_flags: ty.Optional[bool] = False, snake_case_flags: ty.Optional[bool] = False):
+    """Run a resident server which runs command lines of the target sent by clients
+
+    Args:
+        target: reference to the object passed to typedparse.parse in the form 'module:attribute'
+        address: path of the Unix socket, derived from the target by default
+        fast: use the fast parser
+        generate_short_flags: the same as in typedparse.parse
+        snake_case_flags: the same as in typedparse.parse
+    """
+    # the server needs fcntl and Unix sockets, other commands work without them
+    from typedparse.server import serve as serve_target
+
+    serve_target(target, address, ArgParserOptions(generate_short_flags=generate_short_flags,
+                                                   snake_case_flags=snake_case_flags), fast)
+
+
+if __name__ == "__main__":
+    typedparse.parse([freeze, completion, serve])
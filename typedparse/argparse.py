@@ -1,18 +1,185 @@
 import abc
+import itertools
 import string
+import threading
 import typing as ty
-from argparse import ArgumentParser, Namespace
+from argparse import Action, ArgumentError, ArgumentParser, Namespace, _SubParsersAction
 
+import typedparse.dispatch as dispatch
+import typedparse.profile as profile
 import typedparse.spec as spec
+import typedparse.trie as trie
+import typedparse.writer as writer
 from typedparse.parser import Parser, ParserFactory
 
+if ty.TYPE_CHECKING:
+    import asyncio
+
 
 class ArgParserOptions(object):
     def __init__(self,
                  generate_short_flags: bool = False,
-                 snake_case_flags: bool = False):
+                 snake_case_flags: bool = False,
+                 lazy_subparsers: bool = False,
+                 loop: ty.Optional["asyncio.AbstractEventLoop"] = None,
+                 exit_on_error: bool = True,
+                 lazy_docs: bool = False,
+                 allow_abbrev: bool = True,
+                 abbrev_commands: bool = False,
+                 output: ty.Optional[str] = None,
+                 output_flush: ty.Optional[int] = None):
+        writer.check_format(output)
+
         self.generate_short_flags = generate_short_flags
         self.snake_case_flags = snake_case_flags
+        self.lazy_subparsers = lazy_subparsers
+        self.loop = loop
+        self.exit_on_error = exit_on_error
+        self.lazy_docs = lazy_docs
+        self.allow_abbrev = allow_abbrev
+        self.abbrev_commands = abbrev_commands
+        self.output = output
+        self.output_flush = output_flush
+
+
+class ArgParserExit(Exception):
+    """Raised instead of exiting the process when the parser is created with `exit_on_error=False`.
+
+    Attributes:
+        status: Exit status the parser would exit with, 0 after printing help.
+        message: Error message, if any.
+    """
+
+    def __init__(self, status: int = 0, message: ty.Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ArgParserError(ArgParserExit):
+    """Raised instead of exiting the process on invalid command lines."""
+
+    def __init__(self, message: str):
+        super().__init__(2, message)
+
+
+# messages of the parsers which are bound by the current thread, None if the thread doesn't bind
+_binding = threading.local()
+
+
+def _option_tuple_size() -> int:
+    # argparse describes a matched option by (action, option, explicit arg) or since 3.12 by
+    # (action, option, separator, explicit arg)
+    probe = ArgumentParser(add_help=False)
+    probe.add_argument("--probe")
+    return len(probe._get_option_tuples("--pro")[0])
+
+
+_OPTION_TUPLE_SIZE = _option_tuple_size()
+
+
+def _option_tuple(action: Action, option_string: str, sep: ty.Optional[str], explicit_arg: ty.Optional[str]):
+    return (action, option_string, sep, explicit_arg) if _OPTION_TUPLE_SIZE == 4 else \
+        (action, option_string, explicit_arg)
+
+
+class _ArgumentParser(ArgumentParser):
+    """Argument parser which fills in deferred help strings only when the help is formatted.
+
+    While the current thread binds a command line, messages are collected instead of being printed and errors are
+    raised instead of exiting the process.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.deferred_help: ty.List[ty.Tuple[Action, ty.Callable[[], ty.Optional[str]]]] = []
+        self._help_lock = threading.Lock()
+        self._options_trie = trie.PrefixTrie()
+
+    def format_help(self) -> str:
+        with self._help_lock:
+            while self.deferred_help:
+                action, get_help = self.deferred_help.pop()
+                action.help = get_help()
+
+        return super().format_help()
+
+    def _get_option_tuples(self, option_string: str) -> ty.List[ty.Tuple]:
+        """Find the options which the abbreviated option string may stand for with a prefix trie."""
+        if self.prefix_chars != "-" or len(option_string) < 2 or option_string[0] != "-":
+            return super()._get_option_tuples(option_string)
+
+        options = self._options_trie
+
+        if len(options) != len(self._option_string_actions):
+            # options were added since the last lookup
+            options = self._options_trie = trie.PrefixTrie(self._option_string_actions)
+
+        result = []
+
+        if option_string[1] == "-":
+            if self.allow_abbrev:
+                option_prefix, sep, explicit_arg = option_string.partition("=")
+                sep, explicit_arg = (sep, explicit_arg) if sep else (None, None)
+
+                for match in options.complete(option_prefix):
+                    result.append(_option_tuple(self._option_string_actions[match], match, sep, explicit_arg))
+        else:
+            # a short option can be concatenated with its argument
+            short_option_prefix, short_explicit_arg = option_string[:2], option_string[2:]
+
+            for match in options.complete(option_string):
+                result.append(_option_tuple(self._option_string_actions[match], match, None, None))
+
+            if short_option_prefix in self._option_string_actions:
+                action = self._option_string_actions[short_option_prefix]
+                result.insert(0, _option_tuple(action, short_option_prefix, "", short_explicit_arg))
+
+        return result
+
+    def _check_value(self, action: Action, value: ty.Any):
+        if isinstance(action, _LazySubParsersAction):
+            value = action.resolve(value)
+
+        super()._check_value(action, value)
+
+    def _print_message(self, message: str, file: ty.Optional[ty.TextIO] = None):
+        output = getattr(_binding, "output", None)
+
+        if output is None:
+            super()._print_message(message, file)
+        elif message:
+            output.append(message)
+
+    def exit(self, status: int = 0, message: ty.Optional[str] = None):
+        if getattr(_binding, "output", None) is not None:
+            raise ArgParserExit(status, message)
+
+        super().exit(status, message)
+
+    def error(self, message: str):
+        if getattr(_binding, "output", None) is not None:
+            raise ArgParserError(f"{self.prog}: error: {message}")
+
+        super().error(message)
+
+
+def _defer_help(parser: ArgumentParser, action: Action, sp: ty.Union[spec.Argument, spec.ParserSpec]):
+    """Set the help of the action to the description of the argument or command once it is needed."""
+    if sp.desc is not None or sp.doc is None:
+        action.help = sp.desc
+    elif isinstance(parser, _ArgumentParser):
+        parser.deferred_help.append((action, sp.get_desc))
+    else:
+        action.help = sp.get_desc()
+
+
+class _RaisingArgumentParser(_ArgumentParser):
+    def exit(self, status: int = 0, message: ty.Optional[str] = None):
+        raise ArgParserExit(status, message)
+
+    def error(self, message: str):
+        raise ArgParserError(f"{self.prog}: error: {message}")
 
 
 class AbstractArgParser(abc.ABC, Parser):
@@ -20,131 +187,303 @@ class AbstractArgParser(abc.ABC, Parser):
         self._parser = parser
 
     def parse(self, args: ty.Optional[ty.List[str]] = None):
-        args = self._parser.parse_args(args)
-        args.func(args)
+        with profile.phase("argv"):
+            args = self._parser.parse_args(args)
+
+        result = args.func(args)
+
+        if isinstance(args.func, _LeafCommand):
+            args.func.write(result)
+
+    def bind(self, args: ty.Optional[ty.List[str]] = None) -> dispatch.Invocation:
+        output: ty.List[str] = []
+        _binding.output = output
+
+        try:
+            with profile.phase("argv"):
+                namespace = self._parser.parse_args(args)
+
+            if isinstance(namespace.func, _LeafCommand):
+                return namespace.func.bind(namespace)
+
+            # a group of commands prints its help
+            namespace.func(namespace)
+            return dispatch.Invocation(output="".join(output))
+        except ArgParserExit as e:
+            errors = ((e.message or f"exit status {e.status}").strip(),) if e.status else ()
+            return dispatch.Invocation(errors=errors, output="".join(output))
+        except SystemExit as e:
+            errors = (f"exit status {e.code}",) if e.code else ()
+            return dispatch.Invocation(errors=errors, output="".join(output))
+        finally:
+            _binding.output = None
+
+
+def _arguments(options: ArgParserOptions,
+               sp: spec.ParserLeaf) -> ty.List[ty.Tuple[spec.Argument, ty.List[str], ty.Dict[str, ty.Any]]]:
+    """Translate the arguments of the leaf into flags and keyword arguments of `ArgumentParser.add_argument`."""
+    args = sp.args + dispatch.arguments(sp)
+    all_flags = [list(arg.get_flags()) for arg in args]
+    # explicit short flags and -h of argparse are never generated
+    used_short_flags = {"h"} | {flag[1:] for flags in all_flags for flag in flags if len(flag) == 2 and flag[0] == "-"}
+    owners: ty.Dict[str, ty.List[str]] = {}
+    result = []
+
+    def generate_short(long_flag: str) -> str:
+        for c in itertools.chain(long_flag[2:], string.ascii_lowercase):
+            if c.isalpha() and c not in used_short_flags:
+                used_short_flags.add(c)
+                return c
+
+        raise ValueError(f"No more short flag candidates for {long_flag}")
+
+    for arg, flags in zip(args, all_flags):
+        info = arg.info
+
+        if arg.get_bulk_converter() is None:
+            converter = arg.get_converter()
+
+            if arg.get_option("memoize"):
+                import typedparse.memo as memo  # memoization is opt-in, other CLIs don't pay for importing it
+
+                converter = memo.apply(arg, converter)
+
+            converter = profile.wrap(converter, "convert", f"{sp.name}.{arg.name}")
+        else:
+            # bulk converters take all the tokens after parsing, argparse only collects them
+            converter = None
+
+        kwargs = {}
+
+        if info.container is not None:
+            kwargs.update(nargs=arg.get_option("nargs") or info.nargs or "+")
+
+        if arg.default is not None or arg.optional:
+            if info.container is None and not info.is_bool:
+                kwargs.update(nargs="?")
+
+            kwargs.update(default=arg.default)
+
+        metavar = arg.get_metavar()
+        metavar = metavar.upper() if arg.optional else metavar
+
+        if info.is_bool:
+            if arg.optional:
+                if arg.default:
+                    kwargs.update(action="store_false")
+                else:
+                    kwargs.update(action="store_true")
+            else:
+                kwargs.update(type=converter)
+
+                if arg.default:
+                    kwargs.update(nargs="?")
+        else:
+            kwargs.update(type=converter)
+            kwargs.update(metavar=metavar)
+
+            if info.choices is not None:
+                kwargs.update(choices=info.choices)
+
+        if arg.optional:
+            kwargs.update(dest=arg.name)
+
+        kwargs.update(help=arg.desc)
+
+        if len(flags) == 1 and arg.optional and options.generate_short_flags:
+            if len(flags[0]) > 2:
+                short = generate_short(flags[0])
+                flags.append(f"-{short}")
+
+        for i in range(0, len(flags)):
+            flag = flags[i]
+
+            if arg.optional and not (len(flag) == 2 and flag.startswith("-")):
+                flags[i] = flag if options.snake_case_flags else flag.replace("_", "-")
+
+            owners.setdefault(flags[i], []).append(arg.name)
+
+        result.append((arg, flags, kwargs))
+
+    conflicts = [f"{flag} ({', '.join(names)})" for flag, names in owners.items() if len(names) > 1]
+
+    if conflicts:
+        raise ValueError(f"Conflicting flags in '{sp.name}': {', '.join(conflicts)}")
+
+    return result
+
+
+def _finalizer(sp: spec.ParserLeaf, arg: spec.Argument) -> ty.Callable[[ty.Any], ty.Any]:
+    bulk = arg.get_bulk_converter()
+    return profile.wrap(bulk, "convert", f"{sp.name}.{arg.name}") if bulk else arg.info.finalize
+
+
+def _dest(flags: ty.List[str], kwargs: ty.Dict[str, ty.Any]) -> str:
+    return kwargs.get("dest", flags[0])
+
+
+class _LeafCommand(object):
+    """Default `func` of the parser of a leaf, which invokes the command or binds the parsed namespace."""
+
+    def __init__(self, parser: ArgumentParser, sp: spec.ParserLeaf,
+                 dests: ty.List[ty.Tuple[ty.Callable[[ty.Any], ty.Any], str, str]], command: dispatch.Command,
+                 options: ArgParserOptions):
+        self.parser = parser
+        self.sp = sp
+        self.dests = dests
+        self.command = command
+        self.options = options
+
+    def values(self, args: Namespace) -> ty.List[ty.Any]:
+        args = vars(args)
+        actual_args = []
+
+        for finalize, dest, name in self.dests:
+            try:
+                actual_args.append(finalize(args[dest]))
+            except ValueError as e:
+                self.parser.error(f"argument {name}: {e}")
+
+        return actual_args
+
+    def bind(self, args: Namespace) -> dispatch.Invocation:
+        return dispatch.Invocation(self.sp, tuple(self.values(args)), command=self.command)
+
+    def __call__(self, args: Namespace) -> ty.Any:
+        return self.command(self.values(args))
+
+    def write(self, result: ty.Any):
+        if self.options.output is not None:
+            writer.write(result, self.options.output, self.options.output_flush)
 
 
 class ArgParserLeaf(AbstractArgParser):
     def __init__(self, parser: ArgumentParser, options: ArgParserOptions, sp: spec.ParserLeaf):
         super().__init__(parser)
 
-        used_short_flags = []
+        arguments = _arguments(options, sp)
+        dests = [(_finalizer(sp, arg), _dest(flags, kwargs), "/".join(flags)) for arg, flags, kwargs in arguments]
 
-        def to_bool(s: str) -> bool:
-            if s.lower() in ['yes', 'true', 't', 'y', '1']:
-                return True
-            elif s.lower() in ['no', 'false', 'f', 'n', '0']:
-                return False
-            else:
-                raise ValueError(f"Boolean required but found {s}")
-
-        def func(args: Namespace):
-            args = vars(args)
-            actual_args = [args[a.name if a.tpe == "bool" or a.optional else a.get_metavar()] for a in sp.args]
-            sp.func(*actual_args)
-
-        def generate_short(long_flag: str) -> str:
-            index = 2
-            while index < len(long_flag) and long_flag[index] in used_short_flags:
-                index += 1
-
-            if index == len(long_flag):
-                alpha = string.ascii_lowercase
-                index = 0
-                while index < len(alpha) and alpha[index] in used_short_flags:
-                    index += 1
-
-                if index == len(alpha):
-                    raise ValueError(f"No more short flag candidates for {long_flag}")
-                else:
-                    return alpha[index]
-            else:
-                return long_flag[index]
+        for arg, flags, kwargs in arguments:
+            _defer_help(self._parser, self._parser.add_argument(*flags, **kwargs), arg)
 
-        for arg in sp.args:
-            is_list, in_type = arg.is_list()
+        command = dispatch.Command.from_leaf(sp, options.loop)
+        self._parser.set_defaults(func=_LeafCommand(self._parser, sp, dests, command, options))
 
-            kwargs = {}
 
-            if is_list:
-                tpe = in_type
-                kwargs.update(nargs=arg.get_option("nargs") or "+")
-            else:
-                tpe = arg.tpe
+class _DeferredParser(object):
+    def __init__(self, create: ty.Callable[[], ArgumentParser]):
+        self.create = create
 
-            if arg.default is not None or arg.optional:
-                if not is_list and tpe != "bool":
-                    kwargs.update(nargs="?")
 
-                kwargs.update(default=arg.default)
+class _LazyParserMap(dict):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
 
-            metavar = arg.get_metavar()
-            metavar = metavar.upper() if arg.optional else metavar
+    def __getitem__(self, name: str) -> ArgumentParser:
+        parser = super().__getitem__(name)
 
-            type_func = arg.get_option("type")
+        if isinstance(parser, _DeferredParser):
+            # parsers may be shared by threads, each subparser is built once
+            with self._lock:
+                parser = super().__getitem__(name)
 
-            if tpe == "bool":
-                if arg.optional:
-                    if arg.default:
-                        kwargs.update(action="store_false")
-                    else:
-                        kwargs.update(action="store_true")
-                else:
-                    kwargs.update(type=type_func or to_bool)
+                if isinstance(parser, _DeferredParser):
+                    parser = parser.create()
+                    self[name] = parser
 
-                    if arg.default:
-                        kwargs.update(nargs="?")
-            else:
-                kwargs.update(type=type_func or spec.get_class(tpe))
-                kwargs.update(metavar=metavar)
+        return parser
 
-            if arg.optional:
-                kwargs.update(dest=arg.name)
 
-            flags = arg.get_flags()
+class _LazySubParsersAction(_SubParsersAction):
+    """Subparsers which may be built on demand and selected by unambiguous prefixes of their names."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name_parser_map = self.choices = _LazyParserMap()
+        self._names = trie.PrefixTrie()
+        self.allow_abbrev = False
 
-            if len(flags) == 1 and arg.optional and options.generate_short_flags:
-                if len(flags[0]) > 2:
-                    short = generate_short(flags[0])
-                    flags.append(f"-{short}")
+    def add_parser(self, name: str, **kwargs) -> ArgumentParser:
+        self._names.add(name)
+        return super().add_parser(name, **kwargs)
 
-            for i in range(0, len(flags)):
-                flag = flags[i]
+    def add_lazy_parser(self, name: str, build: ty.Callable[[ArgumentParser], ty.Any], **kwargs):
+        """Add a subparser which is created and built only when it is selected on the command line."""
+        self._names.add(name)
+        kwargs.setdefault("prog", f"{self._prog_prefix} {name}")
 
-                if len(flag) == 2 and flag.startswith("-"):
-                    used_short_flags.append(flag[1:])
-                elif arg.optional:
-                    flags[i] = flag if options.snake_case_flags else flag.replace("_", "-")
+        if "help" in kwargs:
+            self._choices_actions.append(self._ChoicesPseudoAction(name, (), kwargs.pop("help")))
 
-            self._parser.add_argument(*flags, help=arg.desc, **kwargs)
+        def create() -> ArgumentParser:
+            parser = self._parser_class(**kwargs)
+            build(parser)
+            return parser
 
-        self._parser.set_defaults(func=func)
+        self._name_parser_map[name] = _DeferredParser(create)
+
+    def resolve(self, name: str) -> str:
+        """Return the name of the only command which starts with the name if abbreviations are allowed."""
+        if not self.allow_abbrev or name in self._name_parser_map:
+            return name
+
+        names = self._names.complete(name)
+
+        if len(names) > 1:
+            raise ArgumentError(self, f"ambiguous choice: {name!r} could match {', '.join(names)}")
+
+        return names[0] if names else name
+
+    def __call__(self, parser: ArgumentParser, namespace: Namespace, values: ty.List[str],
+                 option_string: ty.Optional[str] = None):
+        super().__call__(parser, namespace, [self.resolve(values[0])] + values[1:], option_string)
 
 
 class ArgParserNode(AbstractArgParser):
     def __init__(self, parser: ArgumentParser, options: ArgParserOptions, sp: spec.ParserNode):
         super().__init__(parser)
 
-        sub = self._parser.add_subparsers()
+        def is_lazy(child: spec.ParserSpec) -> bool:
+            return options.lazy_subparsers or isinstance(child, spec.ParserRef)
+
+        if options.abbrev_commands or any(is_lazy(child) for child in sp.children):
+            sub = self._parser.add_subparsers(action=_LazySubParsersAction)
+            sub.allow_abbrev = options.abbrev_commands
+        else:
+            sub = self._parser.add_subparsers()
+
         for child in sp.children:
-            parser = sub.add_parser(child.name)
-            factory = ArgParserFactory(options, parser)
-            factory.create(child)
+            if is_lazy(child):
+                sub.add_lazy_parser(child.name,
+                                    lambda parser, child=child: ArgParserFactory(options, parser).create(child),
+                                    help=None)
+            else:
+                parser = sub.add_parser(child.name, help=None)
+                factory = ArgParserFactory(options, parser)
+                factory.create(child)
+
+            _defer_help(self._parser, sub._choices_actions[-1], child)
 
 
 class ArgParserFactory(ParserFactory):
     def __init__(self, options: ArgParserOptions = None, parser: ty.Optional[ArgumentParser] = None):
-        self._parser = parser or ArgumentParser()
-        self._parser.set_defaults(func=lambda args: self._parser.print_help())
         self._options = options or ArgParserOptions()
+        self._parser = parser or (_ArgumentParser() if self._options.exit_on_error else _RaisingArgumentParser())
+        self._parser.allow_abbrev = self._options.allow_abbrev
+        self._parser.set_defaults(func=lambda args: self._parser.print_help())
 
     def create(self, obj: ty.Any) -> Parser:
         if not isinstance(obj, spec.ParserSpec):
-            obj = spec.create(obj)
-
-        if isinstance(obj, spec.ParserLeaf):
-            return ArgParserLeaf(self._parser, self._options, obj)
-        elif isinstance(obj, spec.ParserNode):
-            return ArgParserNode(self._parser, self._options, obj)
-        else:
-            raise ValueError(obj)
+            obj = spec.create(obj, self._options.lazy_docs)
+        elif isinstance(obj, spec.ParserRef):
+            obj = obj.resolve(self._options.lazy_docs)
+
+        with profile.phase("build"):
+            if isinstance(obj, spec.ParserLeaf):
+                return ArgParserLeaf(self._parser, self._options, obj)
+            elif isinstance(obj, spec.ParserNode):
+                return ArgParserNode(self._parser, self._options, obj)
+            else:
+                raise ValueError(obj)
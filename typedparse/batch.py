@@ -0,0 +1,84 @@
+import shlex
+import sys
+import time
+import typing as ty
+from dataclasses import dataclass, field
+
+from typedparse.argparse import ArgParserExit
+from typedparse.parser import Parser
+
+
+@dataclass
+class BatchSummary(object):
+    """Outcome of a batch.
+
+    Attributes:
+        lines: Number of command lines which were run, blank lines and comments are not counted.
+        failures: Line numbers and messages of the command lines which failed.
+        elapsed: Wall time of the batch in seconds.
+    """
+    lines: int = 0
+    failures: ty.List[ty.Tuple[int, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.lines / self.elapsed if self.elapsed else 0.0
+
+    def report(self) -> str:
+        return (f"{self.lines} lines, {len(self.failures)} failed, "
+                f"{self.elapsed:.3f} s, {self.throughput:.1f} lines/s")
+
+
+def run_batch(parser: Parser, stream: ty.TextIO, errors: ty.Optional[ty.TextIO] = None) -> BatchSummary:
+    """Run each line of the stream as a command line with the same parser.
+
+    Lines are split by shell rules, blank lines and lines starting with '#' are skipped. Errors are reported to
+    `errors` (stderr by default) with the line number and don't stop the batch. The parser must be created with
+    `exit_on_error=False`, otherwise the first invalid line exits the process.
+
+    Args:
+        parser: A parser to run the command lines with.
+        stream: A stream of command lines.
+        errors: A stream to report errors and the summary to.
+    """
+    errors = errors or sys.stderr
+    summary = BatchSummary()
+    start = time.perf_counter()
+
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+
+        if not line or line.startswith("#"):
+            continue
+
+        summary.lines += 1
+
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            args, message = None, f"invalid command line: {e}"
+
+        try:
+            if args is not None:
+                parser.parse(args)
+                continue
+        except ArgParserExit as e:
+            if e.status == 0:
+                continue
+
+            message = (e.message or f"exit status {e.status}").strip()
+        except SystemExit as e:
+            if not e.code:
+                continue
+
+            message = f"exit status {e.code}"
+        except Exception as e:
+            message = f"{type(e).__name__}: {e}"
+
+        summary.failures.append((number, message))
+        print(f"line {number}: {message}", file=errors)
+
+    summary.elapsed = time.perf_counter() - start
+    print(summary.report(), file=errors)
+    return summary
@@ -0,0 +1,260 @@
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import typing as ty
+
+import typedparse.spec as spec
+
+FORMAT_VERSION = 4
+
+
+def default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "typedparse")
+
+
+def _targets(obj: ty.Any) -> ty.List[ty.Any]:
+    if isinstance(obj, list):
+        return [t for child in obj for t in _targets(child)]
+    elif isinstance(obj, (str, spec.ParserSpec)):
+        return []
+    elif inspect.isclass(obj):
+        return [c for c in inspect.getmro(obj) if c is not object]
+    elif inspect.ismethod(obj):
+        return _targets(obj.__func__)
+    elif inspect.isfunction(inspect.unwrap(obj)):
+        return [inspect.unwrap(obj)]
+    else:
+        return _targets(type(obj))
+
+
+def sources(obj: ty.Any) -> ty.List[str]:
+    """Return the source files which define the specification of the object."""
+    result = []
+
+    for target in _targets(obj):
+        try:
+            path = inspect.getsourcefile(target)
+        except TypeError:
+            path = None
+
+        if not path:
+            raise ValueError(f"Unable to find source of {target!r}")
+
+        path = os.path.abspath(path)
+
+        if path not in result:
+            result.append(path)
+
+    return result
+
+
+def identity(obj: ty.Any) -> str:
+    if isinstance(obj, list):
+        return "[" + ",".join(identity(child) for child in obj) + "]"
+    elif isinstance(obj, str):
+        return obj
+    elif isinstance(obj, spec.ParserRef):
+        return obj.target
+
+    target = _targets(obj)[0]
+    return f"{target.__module__}:{target.__qualname__}"
+
+
+def digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def fingerprint(obj: ty.Any) -> str:
+    """Compute a hash of all source files which define the specification of the object."""
+    h = hashlib.sha256()
+
+    for path in sources(obj):
+        h.update(path.encode())
+        h.update(digest(path).encode())
+
+    return h.hexdigest()
+
+
+def stamp(paths: ty.Iterable[str]) -> ty.Dict[str, ty.Tuple[int, int, str]]:
+    """Record the modification time, the size and the content hash of the files."""
+    stamps = {}
+
+    for path in paths:
+        st = os.stat(path)
+        stamps[path] = (st.st_mtime_ns, st.st_size, digest(path))
+
+    return stamps
+
+
+def validate(stamps: ty.Dict[str, ty.Tuple[int, int, str]]) -> ty.Optional[ty.Dict[str, ty.Tuple[int, int, str]]]:
+    """Check that the files are not changed since they were stamped.
+
+    Files are hashed only if their modification time or size differ. Returns None if any file is changed,
+    otherwise returns the stamps with the actual modification times.
+    """
+    result = {}
+
+    for path, (mtime, size, hexdigest) in stamps.items():
+        try:
+            st = os.stat(path)
+
+            if st.st_mtime_ns != mtime or st.st_size != size:
+                if digest(path) != hexdigest:
+                    return None
+        except OSError:
+            return None
+
+        result[path] = (st.st_mtime_ns, st.st_size, hexdigest)
+
+    return result
+
+
+def _detach(sp: spec.ParserSpec) -> spec.ParserSpec:
+    if isinstance(sp, spec.ParserLeaf):
+        leaf = spec.ParserLeaf(None, sp.name, sp.desc)
+        leaf.args = sp.args
+        return leaf
+    elif isinstance(sp, spec.ParserNode):
+        node = spec.ParserNode(sp.name, sp.desc)
+        node.children = [_detach(child) for child in sp.children]
+        return node
+    elif isinstance(sp, spec.ParserRef):
+        return sp
+    else:
+        raise ValueError(sp)
+
+
+def _attach(sp: spec.ParserSpec, obj: ty.Any):
+    if isinstance(sp, spec.ParserLeaf):
+        sp.func = obj
+    elif isinstance(sp, spec.ParserRef):
+        pass
+    elif isinstance(obj, list):
+        for child, child_obj in zip(sp.children, obj):
+            _attach(child, child_obj)
+    elif inspect.isclass(obj):
+        # methods of the class share one lazily created instance
+        members = dict(spec.class_members(obj))
+
+        for child in sp.children:
+            _attach(child, members[child.name])
+    else:
+        for child in sp.children:
+            _attach(child, spec.member(obj, child.name))
+
+
+class SpecCache(object):
+    """On-disk cache of parser specifications.
+
+    Entries are keyed by the module path and qualified name of the object and are invalidated as soon as
+    the modification time and the content hash of any source file differ from the stored ones. The total
+    size of the cache directory is kept under `max_size` bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, directory: ty.Optional[str] = None, max_size: int = 16 * 1024 * 1024):
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+
+    def create(self, obj: ty.Any) -> spec.ParserSpec:
+        try:
+            paths = sources(obj)
+        except (ValueError, OSError):
+            return spec.create(obj)
+
+        path = self._path(obj)
+        entry = self._load(path)
+
+        if entry is not None and sorted(entry["sources"]) == sorted(paths):
+            stamps = validate(entry["sources"])
+
+            if stamps is not None:
+                if stamps != entry["sources"]:
+                    entry["sources"] = stamps
+                    self._store(path, entry)
+                else:
+                    self._touch(path)
+
+                sp = entry["spec"]
+                _attach(sp, obj)
+                return sp
+
+        sp = spec.create(obj)
+        self._store(path, {"sources": stamp(paths), "spec": _detach(sp)})
+        return sp
+
+    def clear(self):
+        for name in self._entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _path(self, obj: ty.Any) -> str:
+        key = f"{FORMAT_VERSION}:{sys.version_info[:2]}:{identity(obj)}"
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".pickle")
+
+    def _entries(self) -> ty.List[str]:
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith(".pickle")]
+        except OSError:
+            return []
+
+    @staticmethod
+    def _load(path: str) -> ty.Optional[ty.Dict]:
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _store(self, path: str, entry: ty.Dict):
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # specs which refer to local functions or classes can't be cached
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+
+            with open(tmp, "wb") as f:
+                f.write(data)
+
+            os.replace(tmp, path)
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+
+        for name in self._entries():
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append((st.st_mtime, st.st_size, name))
+            except OSError:
+                pass
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,274 @@
+import enum
+import re
+import shlex
+import typing as ty
+from dataclasses import dataclass, field
+
+import typedparse.cache as cache
+import typedparse.spec as spec
+from typedparse.argparse import ArgParserOptions, _arguments
+
+SHELLS = ("bash", "zsh", "fish")
+
+_fingerprint = re.compile(r"^# fingerprint: (\w+)$", re.MULTILINE)
+
+
+@dataclass
+class _Flag(object):
+    flags: ty.List[str]
+    desc: ty.Optional[str] = None
+    value: bool = False
+    choices: ty.Optional[ty.List[str]] = None
+
+
+@dataclass
+class _Command(object):
+    path: str
+    subcommands: ty.List[ty.Tuple[str, ty.Optional[str]]] = field(default_factory=list)
+    flags: ty.List[_Flag] = field(default_factory=list)
+    positionals: ty.List[ty.Optional[ty.List[str]]] = field(default_factory=list)
+    variadic: bool = False
+
+
+def _choices(choices: ty.Optional[ty.Iterable[ty.Any]]) -> ty.Optional[ty.List[str]]:
+    if choices is None:
+        return None
+
+    return [c.name if isinstance(c, enum.Enum) else str(c) for c in choices]
+
+
+def _commands(options: ArgParserOptions, sp: spec.ParserSpec, path: str = "") -> ty.List[_Command]:
+    if isinstance(sp, spec.ParserRef):
+        sp = sp.resolve()
+
+    command = _Command(path, flags=[_Flag(["-h", "--help"], "show this help message and exit")])
+    result = [command]
+
+    if isinstance(sp, spec.ParserNode):
+        for child in sp.children:
+            command.subcommands.append((child.name, child.get_desc()))
+            result += _commands(options, child, f"{path} {child.name}".strip())
+    else:
+        for arg, flags, kwargs in _arguments(options, sp):
+            choices = _choices(kwargs.get("choices"))
+
+            if flags[0].startswith("-"):
+                value = kwargs.get("action") not in ("store_true", "store_false")
+                command.flags.append(_Flag(flags, arg.get_desc(), value, choices))
+            else:
+                command.positionals.append(choices)
+                command.variadic = kwargs.get("nargs") not in (None, "?")
+
+    return result
+
+
+def _words(words: ty.Iterable[str]) -> str:
+    return shlex.quote(" ".join(words))
+
+
+def _function(prog: str) -> str:
+    return "_typedparse_" + re.sub(r"\W", "_", prog)
+
+
+def _bash(prog: str, commands: ty.List[_Command]) -> ty.List[str]:
+    func = _function(prog)
+    subcommands = [shlex.quote(f"{c.path}|{name}") for c in commands for name, _ in c.subcommands]
+    value_flags = [shlex.quote(f"{c.path}|{flag}") for c in commands for f in c.flags if f.value for flag in f.flags]
+
+    lines = [
+        f"{func}() {{",
+        "    local cur prev path word i skip=0 positional=0",
+        '    cur="${COMP_WORDS[COMP_CWORD]}"',
+        '    prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        '    path=""',
+        "    COMPREPLY=()",
+        "",
+        "    for ((i = 1; i < COMP_CWORD; i++)); do",
+        '        word="${COMP_WORDS[i]}"',
+        "",
+        "        if ((skip)); then",
+        "            skip=0",
+        "            continue",
+        "        fi",
+        "",
+        '        case "$path|$word" in'
+    ]
+
+    if subcommands:
+        lines += [f"            {'|'.join(subcommands)})",
+                  '                path="${path:+$path }$word"',
+                  "                positional=0",
+                  "                continue;;"]
+
+    if value_flags:
+        lines += [f"            {'|'.join(value_flags)})",
+                  "                skip=1",
+                  "                continue;;"]
+
+    lines += [
+        "        esac",
+        "",
+        '        [[ $word == -* ]] || ((positional++))',
+        "    done",
+        "",
+        '    case "$path|$prev" in'
+    ]
+
+    for c in commands:
+        for f in c.flags:
+            if f.value:
+                patterns = "|".join(shlex.quote(f"{c.path}|{flag}") for flag in f.flags)
+                reply = f'compgen -W {_words(f.choices)} -- "$cur"' if f.choices is not None else 'compgen -f -- "$cur"'
+                lines.append(f"        {patterns}) COMPREPLY=($({reply})); return;;")
+
+    lines += [
+        "    esac",
+        "",
+        '    if [[ $cur == -* ]]; then',
+        '        case "$path" in'
+    ]
+
+    for c in commands:
+        flags = [flag for f in c.flags for flag in f.flags]
+        lines.append(f'            {shlex.quote(c.path)}) COMPREPLY=($(compgen -W {_words(flags)} -- "$cur"));;')
+
+    lines += [
+        "        esac",
+        "",
+        "        return",
+        "    fi",
+        "",
+        '    case "$path|$positional" in'
+    ]
+
+    for c in commands:
+        if c.subcommands:
+            names = _words(name for name, _ in c.subcommands)
+            lines.append(f'        {shlex.quote(c.path + "|")}*) COMPREPLY=($(compgen -W {names} -- "$cur"));;')
+
+        for index, choices in enumerate(c.positionals):
+            if choices is not None:
+                last = c.variadic and index == len(c.positionals) - 1
+                pattern = shlex.quote(f"{c.path}|") + ("*" if last else str(index))
+                lines.append(f'        {pattern}) COMPREPLY=($(compgen -W {_words(choices)} -- "$cur"));;')
+
+    lines += [
+        "    esac",
+        "}",
+        "",
+        f"complete -o default -F {func} {shlex.quote(prog)}"
+    ]
+
+    return lines
+
+
+def _fish(prog: str, commands: ty.List[_Command]) -> ty.List[str]:
+    func = _function(prog)
+    subcommands = [shlex.quote(f"{c.path}|{name}") for c in commands for name, _ in c.subcommands]
+    value_flags = [shlex.quote(f"{c.path}|{flag}") for c in commands for f in c.flags if f.value for flag in f.flags]
+
+    lines = [
+        f"function {func}_path",
+        "    set -l path",
+        "    set -l skip 0",
+        "    set -l words (commandline -opc)",
+        "    set -e words[1]",
+        "",
+        "    for word in $words",
+        "        if test $skip = 1",
+        "            set skip 0",
+        "            continue",
+        "        end",
+        "",
+        '        switch "$path|$word"'
+    ]
+
+    if subcommands:
+        lines += [f"            case {' '.join(subcommands)}",
+                  "                set path $path $word"]
+
+    if value_flags:
+        lines += [f"            case {' '.join(value_flags)}",
+                  "                set skip 1"]
+
+    lines += [
+        "        end",
+        "    end",
+        "",
+        '    echo "$path"',
+        "end",
+        "",
+        f"function {func}_is",
+        f"    set -l path ({func}_path)",
+        '    test "$path" = "$argv[1]"',
+        "end",
+        ""
+    ]
+
+    prefix = f"complete -c {shlex.quote(prog)}"
+
+    for c in commands:
+        condition = "-n " + shlex.quote(f'{func}_is "{c.path}"')
+
+        for name, desc in c.subcommands:
+            lines.append(f"{prefix} {condition} -f -a {shlex.quote(name)} -d {shlex.quote(desc or '')}")
+
+        for f in c.flags:
+            params = [f"-l {flag[2:]}" if flag.startswith("--") else f"-s {flag[1:]}" for flag in f.flags]
+
+            if f.value:
+                params.append("-r")
+
+            if f.choices is not None:
+                params.append(f"-f -a {_words(f.choices)}")
+
+            lines.append(f"{prefix} {condition} {' '.join(params)} -d {shlex.quote(f.desc or '')}")
+
+        choices = [choice for choices in c.positionals if choices is not None for choice in choices]
+
+        if choices:
+            lines.append(f"{prefix} {condition} -f -a {_words(choices)}")
+
+    return lines
+
+
+def completion(obj: ty.Any, shell: str, prog: str, options: ty.Optional[ArgParserOptions] = None) -> str:
+    """Generate a static completion script.
+
+    Scripts don't start Python on completion, they have to be regenerated only if the fingerprint of the
+    specification is changed, see `fingerprint`.
+
+    Args:
+        obj: An object which is passed to `typedparse.parse` or its specification.
+        shell: One of 'bash', 'zsh' or 'fish'.
+        prog: Name of the program to complete.
+        options: Options of the parser, they define generated short flags and the case of long flags.
+    """
+    if shell not in SHELLS:
+        raise ValueError(f"Unsupported shell {shell}, expected one of {', '.join(SHELLS)}")
+
+    sp = obj if isinstance(obj, spec.ParserSpec) else spec.create(obj)
+    commands = _commands(options or ArgParserOptions(), sp)
+    lines = [f"# {shell} completion for {prog} generated by typedparse"]
+
+    if sp is not obj:
+        try:
+            lines.append(f"# fingerprint: {cache.fingerprint(obj)}")
+        except (ValueError, OSError):
+            pass
+
+    if shell == "fish":
+        lines += _fish(prog, commands)
+    else:
+        if shell == "zsh":
+            lines += ["autoload -U +X bashcompinit && bashcompinit", ""]
+
+        lines += _bash(prog, commands)
+
+    return "\n".join(lines) + "\n"
+
+
+def fingerprint(script: str) -> ty.Optional[str]:
+    """Return the fingerprint of the specification the script is generated from."""
+    match = _fingerprint.search(script)
+    return match.group(1) if match else None
@@ -0,0 +1,236 @@
+import inspect
+import typing as ty
+from dataclasses import dataclass, field
+
+import typedparse.profile as profile
+import typedparse.spec as spec
+import typedparse.types as types
+
+if ty.TYPE_CHECKING:
+    import asyncio
+
+
+def is_async(func: ty.Callable) -> bool:
+    return inspect.iscoroutinefunction(inspect.unwrap(func))
+
+
+def _concurrency(sp: spec.ParserLeaf) -> ty.Optional[ty.Tuple[int, int]]:
+    for index, arg in enumerate(sp.args):
+        limit = arg.get_option("concurrency")
+
+        if limit:
+            if arg.info.container is None:
+                raise ValueError(f"Concurrency requires a list but '{arg.name}' is {arg.tpe}")
+
+            return index, int(limit)
+
+    return None
+
+
+def _parallel(sp: spec.ParserLeaf) -> ty.Optional[ty.Tuple[int, bool, bool, bool]]:
+    """Find the list argument with the 'parallel' option and return (index, ordered, collect errors, chunked)."""
+    for index, arg in enumerate(sp.args):
+        if arg.get_option("parallel"):
+            if arg.info.container is None:
+                raise ValueError(f"Parallel execution requires a list but '{arg.name}' is {arg.tpe}")
+
+            errors = arg.get_option("errors") or "fail"
+
+            if errors not in ("fail", "collect"):
+                raise ValueError(f"Expected 'fail' or 'collect' errors policy of '{arg.name}' but found '{errors}'")
+
+            ordered = arg.get_option("ordered")
+            return index, ordered is None or bool(ordered), errors == "collect", bool(arg.get_option("chunked"))
+
+    return None
+
+
+_reserved = ("jobs", "chunk_size")
+
+
+def arguments(sp: spec.ParserLeaf) -> ty.List[spec.Argument]:
+    """Arguments which are added to the command line of the leaf in addition to its formal parameters."""
+    if _parallel(sp) is None:
+        return []
+
+    for arg in sp.args:
+        if arg.name in _reserved:
+            raise ValueError(f"Parameter '{arg.name}' of a parallel command is reserved")
+
+    int_info = types.resolve(ty.Optional[int])
+
+    return [
+        spec.Argument("jobs", int_info.name, True, None, "number of worker processes, the number of CPUs by default",
+                      info=int_info),
+        spec.Argument("chunk_size", int_info.name, True, 1, "number of items sent to a worker process at once",
+                      info=int_info)
+    ]
+
+
+@dataclass(frozen=True)
+class Invocation(object):
+    """A parsed command line which the caller dispatches by calling it, possibly several times.
+
+    Attributes:
+        leaf: Specification of the selected command, None if the command line only printed help or failed.
+        values: Converted values of all the arguments of the command line in the order of the leaf arguments.
+        errors: Error messages, the invocation can't be called if there are any.
+        output: Help or messages which the parser would print to stdout or stderr.
+        command: Command which is run by the invocation.
+    """
+    leaf: ty.Optional[spec.ParserLeaf] = None
+    values: ty.Tuple[ty.Any, ...] = ()
+    errors: ty.Tuple[str, ...] = ()
+    output: str = ""
+    command: ty.Optional["Command"] = field(default=None, repr=False, compare=False)
+
+    @property
+    def arguments(self) -> ty.Optional[inspect.BoundArguments]:
+        """Values bound to the parameters of the function, a new object is returned on each access."""
+        if self.leaf is None:
+            return None
+
+        return inspect.signature(self.leaf.func).bind(*self.values[:len(self.leaf.args)])
+
+    def __call__(self) -> ty.Any:
+        if self.errors:
+            raise ValueError("; ".join(self.errors))
+
+        return self.command(list(self.values)) if self.command is not None else None
+
+
+class ParallelError(Exception):
+    """Raised when invocations of a parallel command with the 'collect' errors policy fail.
+
+    Attributes:
+        errors: Items and exceptions of the failed invocations.
+        results: Results of the successful invocations.
+    """
+
+    def __init__(self, errors: ty.List[ty.Tuple[ty.Any, BaseException]], results: ty.List[ty.Any]):
+        super().__init__(f"{len(errors)} of {len(errors) + len(results)} invocations failed: "
+                         + "; ".join(f"{item!r}: {e!r}" for item, e in errors))
+        self.errors = errors
+        self.results = results
+
+
+def _run_chunk(func: ty.Callable, args: ty.List[ty.Any], index: int, chunk: ty.List[ty.Any], collect: bool,
+               chunked: bool) -> ty.List[ty.Tuple[bool, ty.Any]]:
+    outcomes = []
+
+    for item in [chunk] if chunked else chunk:
+        actual_args = list(args)
+        actual_args[index] = item
+
+        try:
+            outcomes.append((True, func(*actual_args)))
+        except Exception as e:
+            if not collect:
+                raise
+
+            outcomes.append((False, e))
+
+    return outcomes
+
+
+class Command(object):
+    """Invoke a function with parsed arguments.
+
+    Coroutines are run on the given event loop or on a new one. If `concurrency` is set to (index, limit), the
+    function is invoked once per item of the list at the index, at most `limit` invocations at the same time.
+    If `parallel` is set to (index, ordered, collect errors, chunked), the function is invoked once per item or
+    per chunk of the list at the index in a process pool, the last two arguments are the number of processes and
+    the size of a chunk.
+    """
+
+    def __init__(self, func: ty.Callable, name: ty.Optional[str] = None,
+                 loop: ty.Optional["asyncio.AbstractEventLoop"] = None,
+                 concurrency: ty.Optional[ty.Tuple[int, int]] = None,
+                 parallel: ty.Optional[ty.Tuple[int, bool, bool, bool]] = None):
+        if concurrency is not None and not is_async(func):
+            raise ValueError(f"Concurrency requires an async function but '{name}' is not")
+
+        if parallel is not None and (concurrency is not None or is_async(func)):
+            raise ValueError(f"Parallel execution requires a regular function but '{name}' is async")
+
+        self.func = func
+        self.name = name
+        self.loop = loop
+        self.concurrency = concurrency
+        self.parallel = parallel
+
+    @classmethod
+    def from_leaf(cls, sp: spec.ParserLeaf, loop: ty.Optional["asyncio.AbstractEventLoop"] = None) -> "Command":
+        return cls(sp.func, sp.name, loop, _concurrency(sp), _parallel(sp))
+
+    def __call__(self, args: ty.List[ty.Any]) -> ty.Any:
+        with profile.phase("dispatch", self.name):
+            if self.parallel is not None:
+                return self._run_parallel(args[:-2], *self.parallel, *args[-2:])
+            elif self.concurrency is not None:
+                result = self._fan_out(args, *self.concurrency)
+            else:
+                result = self.func(*args)
+
+            if inspect.isawaitable(result):
+                import asyncio  # imported only by async commands, it costs more than the rest of typedparse
+
+                result = self.loop.run_until_complete(result) if self.loop is not None else asyncio.run(result)
+
+            return result
+
+    async def _fan_out(self, args: ty.List[ty.Any], index: int, limit: int) -> ty.List[ty.Any]:
+        import asyncio
+
+        items = list(args[index] or [])
+        results = [None] * len(items)
+        pending = iter(enumerate(items))
+
+        async def worker():
+            for i, item in pending:
+                actual_args = list(args)
+                actual_args[index] = item
+                results[i] = await self.func(*actual_args)
+
+        await asyncio.gather(*(worker() for _ in range(min(limit, len(items)))))
+        return results
+
+    def _run_parallel(self, args: ty.List[ty.Any], index: int, ordered: bool, collect: bool, chunked: bool,
+                      jobs: ty.Optional[int], chunk_size: ty.Optional[int]) -> ty.List[ty.Any]:
+        import concurrent.futures  # it imports logging, which is not needed by other commands
+
+        items = list(args[index] or [])
+        size = max(chunk_size or 1, 1)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        outcomes: ty.List[ty.Optional[ty.List[ty.Tuple[bool, ty.Any]]]] = [None] * len(chunks)
+        completed = []
+
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            futures = {executor.submit(_run_chunk, self.func, args, index, chunk, collect, chunked): i
+                       for i, chunk in enumerate(chunks)}
+
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    i = futures[future]
+                    outcomes[i] = future.result()
+                    completed.append(i)
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        results = []
+        errors = []
+
+        for i in range(len(chunks)) if ordered else completed:
+            units = [chunks[i]] if chunked else chunks[i]
+
+            for item, (ok, value) in zip(units, outcomes[i]):
+                if ok:
+                    results.append(value)
+                else:
+                    errors.append((item, value))
+
+        if errors:
+            raise ParallelError(errors, results)
+
+        return results
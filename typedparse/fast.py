@@ -0,0 +1,324 @@
+import re
+import sys
+import threading
+import typing as ty
+
+import typedparse.dispatch as dispatch
+import typedparse.profile as profile
+import typedparse.spec as spec
+import typedparse.trie as trie
+import typedparse.writer as writer
+from typedparse.argparse import ArgParserFactory, ArgParserOptions, _arguments, _finalizer
+from typedparse.parser import Parser, ParserFactory
+
+# the same pattern argparse uses to tell negative numbers from flags
+_negative_number = re.compile(r"^-\d+$|^-\d*\.\d+$")
+
+_unset = object()
+_pending = object()
+
+
+class _Slot(object):
+    __slots__ = ("index", "nargs", "type", "choices", "const", "default", "min", "max")
+
+    def __init__(self, index: int, kwargs: ty.Dict[str, ty.Any]):
+        action = kwargs.get("action")
+        self.index = index
+        self.nargs = kwargs.get("nargs")
+        self.type = kwargs.get("type")
+        self.choices = kwargs.get("choices")
+
+        if action == "store_true":
+            self.const, default = True, False
+        elif action == "store_false":
+            self.const, default = False, True
+        else:
+            self.const, default = None, None
+
+        self.default = kwargs.get("default", default)
+
+        if self.nargs is None:
+            self.min, self.max = 1, 1
+        elif self.nargs == "?":
+            self.min, self.max = 0, 1
+        elif self.nargs == "*":
+            self.min, self.max = 0, sys.maxsize
+        elif self.nargs == "+":
+            self.min, self.max = 1, sys.maxsize
+        else:
+            self.min, self.max = self.nargs, self.nargs
+
+    def convert(self, s: str) -> ty.Any:
+        value = self.type(s) if self.type is not None else s
+
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(s)
+
+        return value
+
+
+class FastParserLeaf(object):
+    """Parser which binds command-line arguments in one linear pass over flat dispatch tables.
+
+    Only command lines which are accepted by the argparse backend are handled here. Help, errors and rarely used
+    syntax (abbreviated or combined short flags, '--') are delegated to the argparse parser, so the messages and exit
+    codes are the same for both backends.
+    """
+
+    def __init__(self, options: ArgParserOptions, sp: spec.ParserLeaf):
+        self._sp = sp
+        self._command = dispatch.Command.from_leaf(sp, options.loop)
+        self._flags: ty.Dict[str, _Slot] = {}
+        self._positionals: ty.List[_Slot] = []
+        self._slots: ty.List[_Slot] = []
+        finalizers = []
+
+        for arg, flags, kwargs in _arguments(options, sp):
+            slot = _Slot(len(self._slots), kwargs)
+            self._slots.append(slot)
+            finalizers.append(_finalizer(sp, arg))
+
+            if flags[0].startswith("-"):
+                for flag in flags:
+                    self._flags[flag] = slot
+            else:
+                self._positionals.append(slot)
+
+        self._finalizers = tuple(finalizers)
+        self._fixed = all(slot.nargs is None for slot in self._positionals)
+        self._mins = [sum(slot.min for slot in self._positionals[i:]) for i in range(len(self._positionals) + 1)]
+        # flags which look like negative numbers change the meaning of such tokens, leave them to argparse
+        self._enabled = not any(flag[1:2].isdigit() or flag[1:2] == "." for flag in self._flags)
+        # abbreviations of the help flag are left to argparse as well
+        self._prefixes = trie.PrefixTrie(["--help", *self._flags]) if options.allow_abbrev else None
+
+    def _abbreviated(self, token: str) -> ty.Optional[_Slot]:
+        if self._prefixes is None or not token.startswith("--") or " " in token:
+            return None
+
+        matches = self._prefixes.complete(token)
+        return self._flags.get(matches[0]) if len(matches) == 1 else None
+
+    def _is_flag(self, token: str) -> bool:
+        if len(token) < 2 or token[0] != "-":
+            return False
+        elif token in self._flags:
+            return True
+        elif _negative_number.match(token) or " " in token:
+            return False
+        else:
+            return True
+
+    def match(self, args: ty.List[str]) -> ty.Optional[dispatch.Invocation]:
+        """Bind the arguments or return None if the command line has to be handled by argparse.
+
+        Tokens are converted only when the whole command line is matched, so converters with side effects, e.g. ones
+        which open files, are not called before a command line is delegated to argparse, which calls them again.
+        """
+        if not self._enabled:
+            return None
+
+        values: ty.List[ty.Any] = [_unset] * len(self._slots)
+        pending: ty.List[ty.Optional[ty.List[str]]] = [None] * len(self._slots)
+        positional = []
+        flag_seen = interleaved = False
+        i = 0
+        n = len(args)
+
+        while i < n:
+            token = args[i]
+            i += 1
+
+            if not self._is_flag(token):
+                positional.append(token)
+                interleaved = interleaved or flag_seen
+                continue
+
+            flag_seen = True
+            explicit = None
+            slot = self._flags.get(token)
+
+            if slot is None:
+                token, sep, explicit = token.partition("=")
+                slot = self._flags.get(token) if sep and " " not in token else None
+                slot = slot or self._abbreviated(token)
+                explicit = explicit if sep else None
+
+                if slot is None:
+                    return None
+
+            if slot.const is not None:
+                if explicit is not None:
+                    return None
+
+                values[slot.index] = slot.const
+                continue
+
+            if values[slot.index] is _pending:
+                # argparse converts every occurrence of a repeated flag, leave such command lines to it
+                return None
+
+            if explicit is not None:
+                if slot.max != 1:
+                    return None
+
+                strings = [explicit]
+            else:
+                j = i
+                while j < n and j - i < slot.max and not self._is_flag(args[j]):
+                    j += 1
+
+                if j - i < slot.min:
+                    return None
+
+                strings = args[i:j]
+                i = j
+
+            if strings or slot.nargs not in (None, "?"):
+                values[slot.index], pending[slot.index] = _pending, strings
+            elif slot.choices is None:
+                values[slot.index] = None
+            else:
+                return None
+
+        if interleaved and not self._fixed:
+            return None
+
+        k = 0
+        total = len(positional)
+
+        for index, slot in enumerate(self._positionals):
+            take = min(slot.max, total - k - self._mins[index + 1])
+
+            if take < slot.min:
+                return None
+
+            strings = positional[k:k + take]
+            k += take
+
+            if strings:
+                values[slot.index], pending[slot.index] = _pending, strings
+            elif slot.nargs == "?":
+                value = slot.default
+
+                if isinstance(value, str):
+                    values[slot.index], pending[slot.index] = _pending, [value]
+                elif slot.choices is not None and value not in slot.choices:
+                    return None
+                else:
+                    values[slot.index] = value
+            elif slot.choices is not None:
+                return None
+            else:
+                values[slot.index] = slot.default if slot.default is not None else []
+
+        if k != total:
+            return None
+
+        try:
+            for slot in self._slots:
+                value = values[slot.index]
+
+                if value is _pending:
+                    strings = pending[slot.index]
+                    single = slot.nargs is None or slot.nargs == "?"
+                    values[slot.index] = slot.convert(strings[0]) if single else [slot.convert(s) for s in strings]
+                elif value is _unset:
+                    value = slot.default
+                    values[slot.index] = slot.type(value) if isinstance(value, str) and slot.type else value
+
+            actual_args = tuple(finalize(value) for finalize, value in zip(self._finalizers, values))
+        except Exception:
+            return None
+
+        return dispatch.Invocation(self._sp, actual_args, command=self._command)
+
+
+class FastParserNode(object):
+    def __init__(self, options: ArgParserOptions, sp: spec.ParserNode):
+        self._options = options
+        self._children: ty.Dict[str, ty.Any] = {child.name: child for child in sp.children}
+        self._names = trie.PrefixTrie(self._children) if options.abbrev_commands else None
+
+    def match(self, args: ty.List[str]) -> ty.Optional[dispatch.Invocation]:
+        if not args:
+            return None
+
+        name = args[0]
+
+        if name not in self._children and self._names is not None:
+            names = self._names.complete(name)
+            name = names[0] if len(names) == 1 else name
+
+        child = self._children.get(name)
+
+        if child is None:
+            return None
+        elif isinstance(child, spec.ParserSpec):
+            child = self._children[name] = _create(self._options, child)
+
+        return child.match(args[1:])
+
+
+def _create(options: ArgParserOptions, sp: spec.ParserSpec) -> ty.Union[FastParserLeaf, FastParserNode]:
+    if isinstance(sp, spec.ParserRef):
+        sp = sp.resolve(options.lazy_docs)
+
+    if isinstance(sp, spec.ParserLeaf):
+        return FastParserLeaf(options, sp)
+    elif isinstance(sp, spec.ParserNode):
+        return FastParserNode(options, sp)
+    else:
+        raise ValueError(sp)
+
+
+class FastParser(Parser):
+    def __init__(self, options: ArgParserOptions, sp: spec.ParserSpec):
+        self._options = options
+        self._sp = sp
+        self._root = _create(options, sp)
+        self._fallback: ty.Optional[Parser] = None
+        self._lock = threading.Lock()
+
+    def parse(self, args: ty.Optional[ty.List[str]] = None):
+        args = sys.argv[1:] if args is None else list(args)
+
+        with profile.phase("argv"):
+            invocation = self._root.match(args)
+
+        if invocation is not None:
+            result = invocation()
+
+            if self._options.output is not None:
+                writer.write(result, self._options.output, self._options.output_flush)
+        else:
+            self._argparse().parse(args)
+
+    def bind(self, args: ty.Optional[ty.List[str]] = None) -> dispatch.Invocation:
+        args = sys.argv[1:] if args is None else list(args)
+
+        with profile.phase("argv"):
+            invocation = self._root.match(args)
+
+        return invocation if invocation is not None else self._argparse().bind(args)
+
+    def _argparse(self) -> Parser:
+        with self._lock:
+            if self._fallback is None:
+                self._fallback = ArgParserFactory(self._options).create(self._sp)
+
+            return self._fallback
+
+
+class FastParserFactory(ParserFactory):
+    """Factory of parsers which don't use argparse for the command lines they can bind directly."""
+
+    def __init__(self, options: ArgParserOptions = None):
+        self._options = options or ArgParserOptions()
+
+    def create(self, obj: ty.Any) -> Parser:
+        if not isinstance(obj, spec.ParserSpec):
+            obj = spec.create(obj, self._options.lazy_docs)
+
+        with profile.phase("build"):
+            return FastParser(self._options, obj)
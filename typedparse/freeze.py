@@ -0,0 +1,248 @@
+import ast
+import enum
+import importlib.util
+import typing as ty
+from argparse import ArgumentParser, Namespace
+
+import typedparse.cache as cache
+import typedparse.dispatch as dispatch
+import typedparse.memo as memo
+import typedparse.spec as spec
+import typedparse.types as types
+import typedparse.writer as writer
+from typedparse.argparse import ArgParserFactory, ArgParserOptions, _arguments, _dest
+
+_TEMPLATE = '''\
+# Generated by typedparse freeze from {target!r}. Do not edit.
+{imports}from typedparse.freeze import Command, Help, run
+
+TARGET = {target!r}
+
+OPTIONS = {options!r}
+
+SOURCES = {sources!r}
+
+
+def build(p0):
+{body}
+
+def main(args=None):
+    run(TARGET, OPTIONS, SOURCES, build, args)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def _resolve(target: str, path: ty.Tuple[ty.Union[str, int], ...]) -> ty.Any:
+    obj = spec.import_target(target)
+
+    for step in path:
+        obj = obj[step] if isinstance(step, int) else spec.member(obj, step)
+
+    return obj
+
+
+class Command(object):
+    """Command of a frozen parser, the target is imported when the command is invoked."""
+
+    def __init__(self, target: str, path: ty.Tuple[ty.Union[str, int], ...],
+                 dests: ty.Tuple[ty.Tuple[str, ty.Optional[ty.Callable]], ...], name: ty.Optional[str] = None,
+                 concurrency: ty.Optional[ty.Tuple[int, int]] = None,
+                 parallel: ty.Optional[ty.Tuple[int, bool, bool, bool]] = None,
+                 parser: ty.Optional[ArgumentParser] = None):
+        self.target = target
+        self.path = path
+        self.dests = dests
+        self.name = name
+        self.concurrency = concurrency
+        self.parallel = parallel
+        self.parser = parser
+
+    def __call__(self, args: Namespace):
+        args = vars(args)
+        actual_args = []
+
+        for dest, container in self.dests:
+            value = args[dest]
+
+            try:
+                actual_args.append(container(value) if container is not None and isinstance(value, list) else value)
+            except ValueError as e:
+                if self.parser is None:
+                    raise
+
+                self.parser.error(f"argument {dest}: {e}")
+
+        return dispatch.Command(_resolve(self.target, self.path), self.name,
+                                concurrency=self.concurrency, parallel=self.parallel)(actual_args)
+
+
+class Help(object):
+    def __init__(self, parser: ArgumentParser):
+        self.parser = parser
+
+    def __call__(self, args: Namespace):
+        self.parser.print_help()
+
+
+def _digest(module: str) -> ty.Optional[str]:
+    try:
+        module_spec = importlib.util.find_spec(module)
+        return cache.digest(module_spec.origin) if module_spec and module_spec.origin else None
+    except (ImportError, ValueError, OSError):
+        return None
+
+
+def run(target: str, options: ty.Dict[str, ty.Any], sources: ty.Dict[str, str],
+        build: ty.Callable[[ArgumentParser], ty.Any], args: ty.Optional[ty.List[str]] = None):
+    """Parse arguments with a frozen parser or with a dynamic one if the source of the target is changed."""
+    if any(_digest(module) != hexdigest for module, hexdigest in sources.items()):
+        return ArgParserFactory(ArgParserOptions(**options)).create(spec.import_target(target)).parse(args)
+
+    parser = ArgumentParser()
+    parser.set_defaults(func=Help(parser))
+    build(parser)
+
+    args = parser.parse_args(args)
+    result = args.func(args)
+
+    if options.get("output") is not None and not isinstance(args.func, Help):
+        writer.write(result, options["output"], options.get("output_flush"))
+
+
+class _Generator(object):
+    def __init__(self, options: ArgParserOptions):
+        self.options = options
+        self.imports: ty.Set[str] = set()
+        self.modules: ty.Set[str] = set()
+        self.lines: ty.List[str] = []
+        self.count = 0
+
+    def reference(self, obj: ty.Any) -> str:
+        if isinstance(obj, enum.Enum):
+            return f"{self.reference(type(obj))}[{obj.name!r}]"
+        elif isinstance(obj, types.EnumConverter):
+            return f"{self.reference(types.EnumConverter)}({self.reference(obj.enum_class)})"
+        elif isinstance(obj, types.UnionConverter):
+            converters = ", ".join(self.reference(c) for c in obj.converters)
+            return f"{self.reference(types.UnionConverter)}([{converters}])"
+        elif isinstance(obj, memo.MemoizedConverter):
+            params = ", ".join(self.value(v) for v in [obj.converter, obj.max_size, obj.persist])
+            return f"{self.reference(memo.memoize)}({params})"
+        elif isinstance(obj, types.ArrayConverter):
+            params = ", ".join(self.value(v) for v in [obj.tpe, obj.dtype, obj.min, obj.max])
+            return f"{self.reference(types.ArrayConverter)}({params})"
+        elif isinstance(obj, types.StreamConverter):
+            params = ", ".join(self.value(v) for v in [obj.converter, obj.choices, obj.delimiter])
+            return f"{self.reference(types.StreamConverter)}({params})"
+
+        module = getattr(obj, "__module__", None)
+        qualname = getattr(obj, "__qualname__", None)
+
+        if module == "builtins":
+            return qualname
+
+        try:
+            found = spec.import_target(f"{module}:{qualname}") is obj if module and qualname else False
+        except (ImportError, AttributeError):
+            found = False
+
+        if not found:
+            raise ValueError(f"Unable to refer to {obj!r}, only module-level functions and classes can be frozen")
+
+        self.imports.add(module)
+        return f"{module}.{qualname}"
+
+    def value(self, value: ty.Any) -> str:
+        if isinstance(value, enum.Enum) or callable(value):
+            return self.reference(value)
+        elif isinstance(value, tuple):
+            return "(" + "".join(f"{self.value(v)}, " for v in value) + ")"
+
+        text = repr(value)
+
+        try:
+            if ast.literal_eval(text) == value:
+                return text
+        except (ValueError, SyntaxError):
+            pass
+
+        raise ValueError(f"Unable to freeze value {value!r}")
+
+    def parser(self) -> str:
+        self.count += 1
+        return f"p{self.count}"
+
+    def line(self, text: str):
+        self.lines.append(f"    {text}")
+
+    def add_sources(self, obj: ty.Any):
+        for target in cache._targets(obj):
+            if target.__module__ == "__main__":
+                raise ValueError(f"Unable to freeze {target!r} defined in __main__")
+
+            self.modules.add(target.__module__)
+
+    def generate(self, var: str, sp: spec.ParserSpec, obj: ty.Any, target: str, path: ty.Tuple):
+        if isinstance(sp, spec.ParserLeaf):
+            dests = []
+
+            for arg, flags, kwargs in _arguments(self.options, sp):
+                params = [repr(flag) for flag in flags] + [f"{k}={self.value(v)}" for k, v in kwargs.items()]
+                self.line(f"{var}.add_argument({', '.join(params)})")
+
+                container = arg.get_bulk_converter() or (arg.info.container if arg.info.container is not list else None)
+                dests.append(f"({_dest(flags, kwargs)!r}, {self.value(container)})")
+
+            dests = "".join(f"{d}, " for d in dests)
+            concurrency, parallel = dispatch._concurrency(sp), dispatch._parallel(sp)
+            command = f"Command({target!r}, {path!r}, ({dests}), {sp.name!r}, {concurrency!r}, {parallel!r}, {var})"
+            self.line(f"{var}.set_defaults(func={command})")
+        else:
+            sub = f"{var}_sub"
+            self.line(f"{var}.set_defaults(func=Help({var}))")
+            self.line(f"{sub} = {var}.add_subparsers()")
+
+            for index, child in enumerate(sp.children):
+                if isinstance(child, spec.ParserRef):
+                    child_obj = spec.import_target(child.target)
+                    child_target, child_path = child.target, ()
+                    self.add_sources(child_obj)
+                    child = child.resolve()
+                else:
+                    step = index if isinstance(obj, list) else child.name
+                    child_obj = obj[step] if isinstance(step, int) else spec.member(obj, step)
+                    child_target, child_path = target, path + (step,)
+
+                child_var = self.parser()
+                self.line(f"{child_var} = {sub}.add_parser({child.name!r}, help={self.value(child.desc)})")
+                self.generate(child_var, child, child_obj, child_target, child_path)
+
+
+def freeze(target: str, options: ty.Optional[ArgParserOptions] = None) -> str:
+    """Generate the source of a standalone module which contains the parser of the target.
+
+    Args:
+        target: Reference to the object which is passed to `typedparse.parse` in the form 'module:attribute'.
+        options: Options of the parser.
+    """
+    options = options or ArgParserOptions()
+    obj = spec.import_target(target)
+    generator = _Generator(options)
+    generator.add_sources(obj)
+    generator.generate("p0", spec.create(obj), obj, target, ())
+
+    sources = {module: _digest(module) for module in sorted(generator.modules)}
+
+    if None in sources.values():
+        raise ValueError(f"Unable to find sources of {target}")
+
+    return _TEMPLATE.format(
+        target=target,
+        imports="".join(f"import {module}\n" for module in sorted(generator.imports)) + "\n",
+        options=dict(vars(options)),
+        sources=sources,
+        body="\n".join(generator.lines) + "\n"
+    )
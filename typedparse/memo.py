@@ -0,0 +1,209 @@
+import atexit
+import collections
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import threading
+import typing as ty
+from dataclasses import dataclass
+
+import typedparse.cache as cache
+import typedparse.spec as spec
+import typedparse.types as types
+
+DEFAULT_MAX_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class Stats(object):
+    """Statistics of a memoized converter.
+
+    Attributes:
+        name: Name of the converter.
+        hits: Number of tokens converted by a lookup.
+        misses: Number of tokens passed to the converter.
+        size: Number of memoized values.
+    """
+    name: str
+    hits: int
+    misses: int
+    size: int
+
+
+def _parts(converter: ty.Callable) -> ty.List[ty.Callable]:
+    """Callables which define the values of a converter object, e.g. the enumeration of an EnumConverter."""
+    if isinstance(converter, types.EnumConverter):
+        return [converter.enum_class]
+    elif isinstance(converter, types.UnionConverter):
+        return list(converter.converters)
+
+    return []
+
+
+def _name(converter: ty.Callable) -> str:
+    if inspect.isfunction(converter) or inspect.isclass(converter) or inspect.isbuiltin(converter):
+        return f"{converter.__module__}:{converter.__qualname__}"
+
+    parts = _parts(converter)
+
+    if parts:
+        return f"{_name(type(converter))}({', '.join(_name(part) for part in parts)})"
+
+    return f"{_name(type(converter))}({getattr(converter, '__name__', '')})"
+
+
+def _source_digest(converter: ty.Callable) -> ty.Optional[str]:
+    parts = _parts(converter)
+
+    if parts:
+        return ",".join(_source_digest(part) or "" for part in parts)
+
+    try:
+        path = inspect.getsourcefile(inspect.unwrap(converter))
+        return cache.digest(path) if path else None
+    except (TypeError, OSError):
+        return None
+
+
+class MemoizedConverter(object):
+    """Converter which remembers the values of the last `max_size` distinct tokens.
+
+    If `persist` is set, the values are loaded from the cache directory on the first call and stored back at exit.
+    Persisted values are dropped as soon as the source file of the converter is changed. Only pure converters with
+    picklable values should be persisted.
+    """
+
+    def __init__(self, converter: ty.Callable[[str], ty.Any], max_size: int = DEFAULT_MAX_SIZE,
+                 persist: bool = False, directory: ty.Optional[str] = None):
+        self.converter = converter
+        self.max_size = max_size
+        self.persist = persist
+        self.directory = directory or os.path.join(cache.default_directory(), "memo")
+        self.hits = 0
+        self.misses = 0
+        self.__name__ = getattr(converter, "__name__", repr(converter))
+        self._values: ty.Optional[collections.OrderedDict] = None if persist else collections.OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __call__(self, s: str) -> ty.Any:
+        with self._lock:
+            if self._values is None:
+                self._values = self._load()
+
+            try:
+                value = self._values[s]
+            except KeyError:
+                pass
+            else:
+                self._values.move_to_end(s)
+                self.hits += 1
+                return value
+
+        value = self.converter(s)
+
+        with self._lock:
+            self.misses += 1
+            self._values[s] = value
+
+            if len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+            self._dirty = self.persist
+
+        return value
+
+    def stats(self) -> Stats:
+        return Stats(_name(self.converter), self.hits, self.misses, len(self._values or ()))
+
+    def _path(self) -> str:
+        key = f"{cache.FORMAT_VERSION}:{sys.version_info[:2]}:{_name(self.converter)}"
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".pickle")
+
+    def _load(self) -> collections.OrderedDict:
+        try:
+            with open(self._path(), "rb") as f:
+                entry = pickle.load(f)
+
+            if entry["source"] == _source_digest(self.converter):
+                values = entry["values"]
+
+                while len(values) > self.max_size:
+                    values.popitem(last=False)
+
+                return values
+        except Exception:
+            pass
+
+        return collections.OrderedDict()
+
+    def save(self):
+        """Store the memoized values if they are changed since they were loaded."""
+        with self._lock:
+            if not self._dirty:
+                return
+
+            try:
+                data = pickle.dumps({"source": _source_digest(self.converter), "values": self._values},
+                                    protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                return
+
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                path = self._path()
+                tmp = f"{path}.{os.getpid()}.tmp"
+
+                with open(tmp, "wb") as f:
+                    f.write(data)
+
+                os.replace(tmp, path)
+                self._dirty = False
+            except OSError:
+                pass
+
+
+_converters: ty.Dict[ty.Tuple[ty.Callable, int, bool], MemoizedConverter] = {}
+
+
+def memoize(converter: ty.Callable[[str], ty.Any], max_size: int = DEFAULT_MAX_SIZE,
+            persist: bool = False) -> MemoizedConverter:
+    """Return the memoized converter, the same instance is shared by all arguments with the same converter."""
+    key = (converter, max_size, persist)
+    memoized = _converters.get(key)
+
+    if memoized is None:
+        memoized = _converters.setdefault(key, MemoizedConverter(converter, max_size, persist))
+
+        if persist:
+            atexit.register(memoized.save)
+
+    return memoized
+
+
+def apply(arg: spec.Argument, converter: ty.Callable[[str], ty.Any]) -> ty.Callable[[str], ty.Any]:
+    """Memoize the converter of the argument if it has the 'memoize' option.
+
+    The option is True or the maximal number of memoized values, the 'persist' option stores the values on disk.
+    Items of streams are memoized instead of streams themselves.
+    """
+    max_size = arg.get_option("memoize")
+
+    if not max_size:
+        return converter
+
+    max_size = DEFAULT_MAX_SIZE if max_size is True else max_size
+    persist = bool(arg.get_option("persist"))
+
+    if isinstance(converter, types.StreamConverter):
+        return types.StreamConverter(memoize(converter.converter, max_size, persist), converter.choices,
+                                     converter.delimiter)
+
+    return memoize(converter, max_size, persist)
+
+
+def stats() -> ty.List[Stats]:
+    """Statistics of all memoized converters."""
+    return [memoized.stats() for memoized in _converters.values()]
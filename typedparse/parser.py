@@ -7,6 +7,15 @@ class Parser(object):
     def parse(self, args: ty.Optional[ty.List[str]] = None):
         pass
 
+    @abc.abstractmethod
+    def bind(self, args: ty.Optional[ty.List[str]] = None):
+        """Parse the command line into a `typedparse.Invocation` without invoking the command.
+
+        Help and errors are returned in the invocation instead of being printed, the process never exits. A parser
+        can bind command lines from several threads at the same time.
+        """
+        pass
+
 
 class ParserFactory(abc.ABC):
     @abc.abstractmethod
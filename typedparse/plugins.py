@@ -0,0 +1,227 @@
+import ast
+import hashlib
+import os
+import pickle
+import sys
+import typing as ty
+
+import typedparse.cache as cache
+import typedparse.spec as spec
+
+if ty.TYPE_CHECKING:
+    import importlib.metadata
+
+
+def _entry_points(group: str) -> ty.List["importlib.metadata.EntryPoint"]:
+    import importlib.metadata  # the metadata of distributions is read only when the index is rebuilt
+
+    entry_points = importlib.metadata.entry_points()
+
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=group))
+
+    return list(entry_points.get(group, []))
+
+
+_metadata = (".dist-info", ".egg-info", ".egg-link", ".pth")
+
+_PathStamps = ty.List[ty.Tuple[str, ty.Optional[int], ty.Tuple[str, ...]]]
+
+
+def _mtime(entry: str) -> ty.Optional[int]:
+    try:
+        return os.stat(entry or os.getcwd()).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _distributions(entry: str) -> ty.Tuple[str, ...]:
+    try:
+        return tuple(sorted(name for name in os.listdir(entry or os.getcwd()) if name.endswith(_metadata)))
+    except OSError:
+        return ()
+
+
+def stamp_paths() -> _PathStamps:
+    """Record the modification time and the names of distribution metadata of each directory on `sys.path`."""
+    return [(entry, _mtime(entry), _distributions(entry)) for entry in sys.path]
+
+
+def validate_paths(stamps: _PathStamps) -> ty.Optional[_PathStamps]:
+    """Check that no distribution is installed, upgraded or removed since the paths were stamped.
+
+    Directories are listed only if their modification time differs. Returns None if the distributions are changed,
+    otherwise returns the stamps with the actual modification times.
+    """
+    if [entry for entry, _, _ in stamps] != sys.path:
+        return None
+
+    result = []
+
+    for entry, mtime, names in stamps:
+        actual = _mtime(entry)
+
+        if actual != mtime and _distributions(entry) != names:
+            return None
+
+        result.append((entry, actual, names))
+
+    return result
+
+
+def _find_source(module: str) -> ty.Optional[str]:
+    """Find the source file of the module without importing it or its parent packages."""
+    parts = module.split(".")
+
+    for entry in sys.path:
+        base = os.path.join(entry or os.getcwd(), *parts)
+
+        for path in (f"{base}.py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(path):
+                return os.path.abspath(path)
+
+    return None
+
+
+def _describe(target: str, path: ty.Optional[str]) -> ty.Optional[str]:
+    """Read the short description of the target from the docstring in its source."""
+    if path is None:
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            node = ast.parse(f.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    attr = target.partition(":")[2]
+
+    for name in attr.split("."):
+        defs = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        node = next((n for n in node.body if isinstance(n, defs) and n.name == name), None)
+
+        if node is None:
+            return None
+
+    text = ast.get_docstring(node)
+
+    try:
+        return spec.Docstring(text, attr).short_description() if text else None
+    except Exception:
+        return None
+
+
+def _scan(group: str) -> ty.List[ty.Tuple[str, str, ty.Optional[str], ty.Optional[str]]]:
+    """Return the name, the target, the description and the source path of each plugin in the group."""
+    plugins = []
+    names = set()
+
+    for entry_point in _entry_points(group):
+        target = entry_point.value.partition("[")[0].strip()
+
+        if entry_point.name in names or ":" not in target:
+            continue
+
+        names.add(entry_point.name)
+        path = _find_source(target.partition(":")[0])
+        plugins.append((entry_point.name, target, _describe(target, path), path))
+
+    return sorted(plugins)
+
+
+class PluginIndex(object):
+    """On-disk index of the commands registered in entry point groups.
+
+    An index is rebuilt when `sys.path` or the distributions installed into its directories change, i.e. a
+    distribution is installed, upgraded or removed, or when a source file of a plugin is changed. Reinstalling the
+    same version of a distribution with other entry points is not detected, use a new version or `clear`.
+    """
+
+    def __init__(self, directory: ty.Optional[str] = None):
+        self.directory = directory or os.path.join(cache.default_directory(), "plugins")
+
+    def scan(self, group: str) -> ty.List[ty.Tuple[str, str, ty.Optional[str]]]:
+        """Return the name, the target and the description of each plugin in the group."""
+        path = self._path(group)
+        entry = self._load(path)
+
+        if entry is not None:
+            paths = validate_paths(entry["paths"])
+            sources = cache.validate(entry["sources"]) if paths is not None else None
+
+            if sources is not None:
+                if paths != entry["paths"] or sources != entry["sources"]:
+                    entry.update(paths=paths, sources=sources)
+                    self._store(path, entry)
+
+                return entry["plugins"]
+
+        paths = stamp_paths()
+        scanned = _scan(group)
+        plugins = [(name, target, desc) for name, target, desc, _ in scanned]
+        sources = cache.stamp({source for _, _, _, source in scanned if source is not None})
+        self._store(path, {"paths": paths, "sources": sources, "plugins": plugins})
+        return plugins
+
+    def clear(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            if name.endswith(".pickle"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _path(self, group: str) -> str:
+        key = f"{cache.FORMAT_VERSION}:{sys.version_info[:2]}:{sys.executable}:{group}"
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".pickle")
+
+    @staticmethod
+    def _load(path: str) -> ty.Optional[ty.Dict]:
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def _store(self, path: str, entry: ty.Dict):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+def discover(group: str, name: ty.Optional[str] = None, desc: ty.Optional[str] = None,
+             index: ty.Union[bool, PluginIndex] = True) -> spec.ParserNode:
+    """Create a group of commands from the entry points of the group.
+
+    Each entry point in the form 'module:attribute' becomes a command named after the entry point, the module is
+    imported only when the command is invoked. Descriptions are read from the sources without importing them.
+
+    Args:
+        group: Name of the entry point group.
+        name: Name of the group of commands if it's nested into another one.
+        desc: Description of the group of commands.
+        index: Cache the discovered plugins on disk, it can be true to use the default index or a PluginIndex.
+    """
+    if index:
+        plugins = (index if isinstance(index, PluginIndex) else PluginIndex()).scan(group)
+    else:
+        plugins = [(plugin, target, plugin_desc) for plugin, target, plugin_desc, _ in _scan(group)]
+
+    node = spec.ParserNode(name, desc)
+
+    for plugin, target, plugin_desc in plugins:
+        node.add(spec.ParserRef(target, plugin, plugin_desc))
+
+    return node
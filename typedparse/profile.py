@@ -0,0 +1,118 @@
+import contextlib
+import contextvars
+import functools
+import sys
+import time
+import typing as ty
+from dataclasses import dataclass
+
+ENV_VAR = "TYPEDPARSE_PROFILE"
+
+
+@dataclass
+class Record(object):
+    """Accumulated cost of a phase.
+
+    Attributes:
+        phase: Name of the phase, e.g. 'spec', 'docstring', 'build', 'argv', 'convert', 'dispatch' or 'output'.
+        detail: Name of the command or the argument the record belongs to, if any.
+        calls: Number of times the phase was entered.
+        wall: Wall time in seconds.
+        cpu: CPU time of the process in seconds.
+        blocks: Difference of the number of allocated memory blocks.
+    """
+    phase: str
+    detail: ty.Optional[str] = None
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    blocks: int = 0
+
+
+class Profiler(object):
+    """Collects wall time, CPU time and allocations of the phases of an invocation.
+
+    Phases are inclusive, e.g. time of type conversion is a part of the 'argv' phase. If a phase is entered
+    recursively, only the outermost entry is recorded.
+    """
+
+    def __init__(self):
+        self.records: ty.Dict[ty.Tuple[str, ty.Optional[str]], Record] = {}
+        self._active: ty.Set[ty.Tuple[str, ty.Optional[str]]] = set()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, detail: ty.Optional[str] = None):
+        key = (name, detail)
+
+        if key in self._active:
+            yield
+            return
+
+        self._active.add(key)
+        blocks = sys.getallocatedblocks()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            blocks = sys.getallocatedblocks() - blocks
+            self._active.discard(key)
+
+            record = self.records.setdefault(key, Record(name, detail))
+            record.calls += 1
+            record.wall += wall
+            record.cpu += cpu
+            record.blocks += blocks
+
+    def report(self) -> str:
+        lines = [f"{'phase':<12} {'detail':<32} {'calls':>7} {'wall, ms':>10} {'cpu, ms':>10} {'blocks':>9}"]
+
+        for r in self.records.values():
+            lines.append(f"{r.phase:<12} {r.detail or '':<32} {r.calls:>7} {r.wall * 1000:>10.3f} "
+                         f"{r.cpu * 1000:>10.3f} {r.blocks:>9}")
+
+        return "\n".join(lines)
+
+
+# each thread and each task has its own active profiler, so concurrent invocations don't record into each other
+_profiler: "contextvars.ContextVar[ty.Optional[Profiler]]" = contextvars.ContextVar("typedparse_profiler", default=None)
+_null = contextlib.nullcontext()
+
+
+def phase(name: str, detail: ty.Optional[str] = None) -> ty.ContextManager:
+    """Measure a phase if profiling is enabled."""
+    profiler = _profiler.get()
+    return _null if profiler is None else profiler.phase(name, detail)
+
+
+def wrap(func: ty.Callable, name: str, detail: ty.Optional[str] = None) -> ty.Callable:
+    """Measure every call of the function as a phase if profiling is enabled when the function is wrapped."""
+    profiler = _profiler.get()
+
+    if profiler is None or func is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapped(*args, **kwargs):
+        with profiler.phase(name, detail):
+            return func(*args, **kwargs)
+
+    return wrapped
+
+
+@contextlib.contextmanager
+def profiling(profiler: Profiler):
+    """Enable profiling within the context."""
+    token = _profiler.set(profiler)
+
+    try:
+        yield profiler
+    finally:
+        _profiler.reset(token)
+
+
+def print_report(profiler: Profiler):
+    print(profiler.report(), file=sys.stderr)
@@ -0,0 +1,330 @@
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import typing as ty
+
+import typedparse.cache as cache
+import typedparse.spec as spec
+from typedparse.argparse import ArgParserFactory, ArgParserOptions
+from typedparse.fast import FastParserFactory
+from typedparse.parser import Parser
+
+# status sent instead of the exit status when the server exits because the sources are changed
+RESTART = -1
+
+_header = struct.Struct("!I")
+_status = struct.Struct("!i")
+
+
+def _runtime_directory() -> str:
+    """Directory of sockets which only the current user can access.
+
+    `XDG_RUNTIME_DIR` is private by definition, otherwise a directory of the user is created in the temporary
+    directory. It must be a real directory owned by the user and inaccessible to others, since it's shared by all
+    users and anybody could create it first.
+    """
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+
+    if directory:
+        return directory
+
+    directory = os.path.join(tempfile.gettempdir(), f"typedparse-{os.getuid()}")
+
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(directory)
+
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory accessible only to its owner")
+
+    return directory
+
+
+def default_address(target: str) -> str:
+    """Path of the Unix socket of the server of the target in a directory which only the current user can access.
+
+    The process id of the server is written to the file with the same path and the '.lock' suffix.
+    """
+    directory = _runtime_directory()
+    key = hashlib.sha256(f"{os.getuid()}:{sys.executable}:{target}".encode()).hexdigest()[:16]
+    return os.path.join(directory, f"typedparse-{key}.sock")
+
+
+def _peer_uid(conn: socket.socket) -> ty.Optional[int]:
+    """User id of the process on the other end of a Unix socket, None if the platform doesn't report it."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+
+    _, uid, _ = struct.unpack("3i", conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+    return uid
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data = b""
+
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+
+        if not chunk:
+            raise ConnectionError("Connection closed")
+
+        data += chunk
+
+    return data
+
+
+def _refs(sp: spec.ParserSpec) -> ty.Iterator[spec.ParserRef]:
+    if isinstance(sp, spec.ParserRef):
+        yield sp
+    elif isinstance(sp, spec.ParserNode):
+        for child in sp.children:
+            yield from _refs(child)
+
+
+def _sources(obj: ty.Any, seen: ty.Optional[ty.Set[str]] = None) -> ty.List[str]:
+    """Source files of the object and of all the commands it refers to, also by strings or in nested groups."""
+    seen = set() if seen is None else seen
+    paths = cache.sources(obj)
+    sp = obj if isinstance(obj, spec.ParserSpec) else spec.create(obj, lazy_docs=True)
+
+    for ref in _refs(sp):
+        if ref.target not in seen:
+            seen.add(ref.target)
+            paths += [path for path in _sources(spec.import_target(ref.target), seen) if path not in paths]
+
+    return paths
+
+
+class Server(object):
+    """Resident process which keeps the parser of the target and runs each request in a forked child.
+
+    A request carries argv, cwd, environment and the stdio file descriptors of the client, the response is the exit
+    status of the child. The server exits as soon as any source file of the target is changed, the next client starts
+    a new one.
+    """
+
+    def __init__(self, target: str, address: ty.Optional[str] = None, options: ty.Optional[ArgParserOptions] = None,
+                 fast: bool = False):
+        # classes are instantiated by each child after argv is parsed, not shared by all of them
+        obj = spec.import_target(target)
+        self.address = address or default_address(target)
+        self.stamps = cache.stamp(_sources(obj))
+        options = options or ArgParserOptions()
+        factory = FastParserFactory(options) if fast else ArgParserFactory(options)
+        self.parser: Parser = factory.create(obj)
+        self._waiters: ty.List[threading.Thread] = []
+        self._lock: ty.Optional[ty.TextIO] = None
+
+    def serve(self):
+        fd = os.open(f"{self.address}.lock", os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+
+        with os.fdopen(fd, "w") as self._lock:
+            try:
+                fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # another server is running
+
+            # the file is truncated only by its owner, so the process id of a running server is never lost
+            self._lock.truncate(0)
+            self._lock.write(str(os.getpid()))
+            self._lock.flush()
+
+            if os.path.lexists(self.address):
+                os.remove(self.address)
+
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+                listener.bind(self.address)
+                os.chmod(self.address, 0o600)
+                listener.listen()
+
+                try:
+                    self._loop(listener)
+                finally:
+                    os.remove(self.address)
+
+                    for waiter in self._waiters:
+                        waiter.join()
+
+    def _loop(self, listener: socket.socket):
+        while True:
+            conn, _ = listener.accept()
+            uid = _peer_uid(conn)
+
+            if uid is not None and uid != os.getuid():
+                conn.close()
+                continue
+
+            try:
+                request, fds = self._receive(conn)
+            except (OSError, ValueError):
+                conn.close()
+                continue
+
+            if cache.validate(self.stamps) is None:
+                for fd in fds:
+                    os.close(fd)
+
+                conn.sendall(_status.pack(RESTART))
+                conn.close()
+                return
+
+            pid = os.fork()
+
+            if pid == 0:
+                # the lock is shared with the children, it must be released as soon as the server exits
+                self._lock.close()
+                listener.close()
+                self._child(request, fds)
+
+            for fd in fds:
+                os.close(fd)
+
+            self._waiters = [waiter for waiter in self._waiters if waiter.is_alive()]
+            waiter = threading.Thread(target=self._wait, args=(pid, conn), daemon=True)
+            waiter.start()
+            self._waiters.append(waiter)
+
+    @staticmethod
+    def _receive(conn: socket.socket) -> ty.Tuple[ty.Dict[str, ty.Any], ty.List[int]]:
+        data, fds, _, _ = socket.recv_fds(conn, _header.size, 3)
+
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+
+            raise ValueError("Expected stdin, stdout and stderr")
+
+        size, = _header.unpack(data + _recv_exactly(conn, _header.size - len(data)))
+        return json.loads(_recv_exactly(conn, size)), fds
+
+    def _child(self, request: ty.Dict[str, ty.Any], fds: ty.List[int]):
+        status = 1
+
+        try:
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            sys.argv = request["argv"]
+
+            try:
+                self.parser.parse(request["argv"][1:])
+                status = 0
+            except SystemExit as e:
+                if isinstance(e.code, int) or e.code is None:
+                    status = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+            except BaseException:
+                traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(status)
+
+    @staticmethod
+    def _wait(pid: int, conn: socket.socket):
+        with conn:
+            _, status = os.waitpid(pid, 0)
+            code = os.waitstatus_to_exitcode(status)
+
+            try:
+                conn.sendall(_status.pack(code if code >= 0 else 128 - code))
+            except OSError:
+                pass
+
+
+def serve(target: str, address: ty.Optional[str] = None, options: ty.Optional[ArgParserOptions] = None,
+          fast: bool = False):
+    """Run the server of the target until any of its source files is changed.
+
+    Args:
+        target: Reference to the object which is passed to `typedparse.parse` in the form 'module:attribute'.
+        address: Path of the Unix socket, see `default_address`.
+        options: Options of the parser.
+        fast: Use the fast parser.
+    """
+    Server(target, address, options, fast).serve()
+
+
+def _spawn(target: str, address: str, args: ty.List[str]):
+    argv = [sys.executable, "-m", "typedparse", "serve", target, "--address", address] + args
+    devnull = [(os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_RDWR, 0) for fd in range(3)]
+    os.posix_spawn(sys.executable, argv, os.environ, file_actions=devnull, setsid=True)
+
+
+def call(target: str, args: ty.Optional[ty.List[str]] = None, address: ty.Optional[str] = None,
+         server_args: ty.Optional[ty.List[str]] = None, timeout: float = 10.0) -> int:
+    """Run a command line by the server of the target, the server is started if it's not running.
+
+    Args:
+        target: Reference to the object which is passed to `typedparse.parse` in the form 'module:attribute'.
+        args: Command-line arguments, `sys.argv` by default.
+        address: Path of the Unix socket, see `default_address`.
+        server_args: Arguments of `python -m typedparse serve` used to start the server, e.g. ['--fast'].
+        timeout: Time to wait for the server to start in seconds.
+
+    Returns:
+        Exit status of the command.
+    """
+    argv = sys.argv[:1] + list(args) if args is not None else list(sys.argv)
+    address = address or default_address(target)
+    payload = json.dumps({"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}).encode()
+    deadline = time.monotonic() + timeout
+    spawned = None
+
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+
+    while True:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            try:
+                conn.connect(address)
+            except (FileNotFoundError, ConnectionRefusedError):
+                status = RESTART
+            else:
+                # the request carries the environment and the stdio of the client, it's sent only to its own server
+                uid = _peer_uid(conn)
+
+                if (uid if uid is not None else os.stat(address).st_uid) != os.getuid():
+                    raise PermissionError(f"Server at {address} is run by another user")
+
+                socket.send_fds(conn, [_header.pack(len(payload))], [0, 1, 2])
+                conn.sendall(payload)
+                status, = _status.unpack(_recv_exactly(conn, _status.size))
+
+        if status != RESTART:
+            return status
+
+        now = time.monotonic()
+
+        if now > deadline:
+            raise TimeoutError(f"Server of {target} is not available at {address}")
+
+        if spawned is None or now - spawned > 1.0:
+            _spawn(target, address, server_args or [])
+            spawned = now
+
+        time.sleep(0.01)
+
+
+def main(target: str, args: ty.Optional[ty.List[str]] = None, **kwargs):
+    """Entry point of a client script, exits with the status of the command."""
+    sys.exit(call(target, args, **kwargs))
@@ -1,13 +1,51 @@
 import abc
+import enum
+import importlib
 import inspect
-import re
+import sys
+import threading
 import typing as ty
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from docstring_parser import parse
 
+import typedparse.profile as profile
+import typedparse.types as types
 
-@dataclass
+
+# slots make arguments of large CLIs several times smaller, dataclasses support them since Python 3.10
+_slots = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class Docstring(object):
+    """Raw docstring which is parsed only when a description is requested, e.g. when help is formatted."""
+
+    __slots__ = ("text", "name", "_parsed", "_params")
+
+    def __init__(self, text: ty.Optional[str], name: str):
+        self.text = text
+        self.name = name
+        self._parsed = None
+        self._params: ty.Optional[ty.Dict[str, str]] = None
+
+    def parse(self):
+        if self._parsed is None:
+            with profile.phase("docstring", self.name):
+                self._parsed = parse(self.text)
+
+        return self._parsed
+
+    def short_description(self) -> ty.Optional[str]:
+        return _intern(self.parse().short_description)
+
+    def param(self, name: str) -> ty.Optional[str]:
+        if self._params is None:
+            self._params = {param.arg_name: param.description for param in self.parse().params}
+
+        return _intern(self._params.get(name))
+
+
+@dataclass(**_slots)
 class Argument(object):
     name: str
     tpe: str
@@ -15,10 +53,47 @@ class Argument(object):
     default: ty.Optional[ty.Any]
     desc: str
     options: ty.Optional[ty.Any] = None
+    info: ty.Optional[types.TypeInfo] = field(default=None, compare=False, repr=False)
+    doc: ty.Optional[Docstring] = field(default=None, compare=False, repr=False)
+
+    def get_desc(self) -> ty.Optional[str]:
+        """Description of the argument, the docstring of a lazily created specification is parsed on demand."""
+        if self.desc is None and self.doc is not None:
+            return self.doc.param(self.name)
+
+        return self.desc
 
     def is_list(self) -> (bool, ty.Optional[str]):
-        result = re.search(r"typing.List\[(.+)]", self.tpe)
-        return (True, result.group(1)) if result else (False, None)
+        if self.info is not None and self.info.container is not None:
+            return True, types.type_name(self.info.tpe)
+        else:
+            return False, None
+
+    def get_converter(self) -> ty.Callable[[str], ty.Any]:
+        converter = self.get_option("type") or self.info.converter
+        delimiter = self.get_option("delimiter")
+
+        if delimiter and isinstance(converter, types.StreamConverter):
+            converter = types.StreamConverter(converter.converter, converter.choices, delimiter)
+
+        return converter
+
+    def get_bulk_converter(self) -> ty.Optional[types.ArrayConverter]:
+        """Converter of the whole list of tokens for NumPy arrays and lists with the 'array' option."""
+        bulk = self.info.bulk
+
+        if bulk is None and self.get_option("array"):
+            if self.info.container is None:
+                raise ValueError(f"Arrays require a list but '{self.name}' is {self.tpe}")
+
+            bulk = types.ArrayConverter(self.info.tpe)
+
+        low, high = self.get_option("min"), self.get_option("max")
+
+        if bulk is not None and (low is not None or high is not None):
+            bulk = types.ArrayConverter(bulk.tpe, bulk.dtype, low, high)
+
+        return bulk
 
     def get_flags(self) -> ty.List[str]:
         flags_opt = self.get_option("flags")
@@ -71,14 +146,27 @@ class Argument(object):
 
 
 class ParserSpec(abc.ABC):
-    def __init__(self, name: ty.Optional[str], desc: ty.Optional[str]):
+    __slots__ = ("name", "desc", "doc")
+
+    def __init__(self, name: ty.Optional[str], desc: ty.Optional[str], doc: ty.Optional[Docstring] = None):
         self.name = name
         self.desc = desc
+        self.doc = doc
+
+    def get_desc(self) -> ty.Optional[str]:
+        """Description of the command, the docstring of a lazily created specification is parsed on demand."""
+        if self.desc is None and self.doc is not None:
+            return self.doc.short_description()
+
+        return self.desc
 
 
 class ParserNode(ParserSpec):
-    def __init__(self, name: ty.Optional[str] = None, desc: ty.Optional[str] = None):
-        super().__init__(name, desc)
+    __slots__ = ("children",)
+
+    def __init__(self, name: ty.Optional[str] = None, desc: ty.Optional[str] = None,
+                 doc: ty.Optional[Docstring] = None):
+        super().__init__(name, desc, doc)
         self.children: ty.List[ParserSpec] = []
 
     def add(self, child: ParserSpec):
@@ -86,121 +174,314 @@ class ParserNode(ParserSpec):
 
 
 class ParserLeaf(ParserSpec):
-    def __init__(self, func: ty.Callable, name: ty.Optional[str] = None, desc: ty.Optional[str] = None):
-        super().__init__(name, desc)
+    __slots__ = ("func", "args", "_index")
+
+    def __init__(self, func: ty.Callable, name: ty.Optional[str] = None, desc: ty.Optional[str] = None,
+                 doc: ty.Optional[Docstring] = None):
+        super().__init__(name, desc, doc)
         self.func = func
         self.args: ty.List[Argument] = []
+        self._index: ty.Dict[str, Argument] = {}
 
     def add(self, arg):
         self.args.append(arg)
+        self._index[arg.name] = arg
 
     def get(self, name: str) -> ty.Optional[Argument]:
-        for arg in self.args:
-            if arg.name == name:
-                return arg
+        if len(self._index) != len(self.args):
+            # args were replaced or appended directly
+            self._index = {arg.name: arg for arg in self.args}
 
-        return None
+        return self._index.get(name)
 
 
-def _create_from_function(func: ty.Callable) -> ParserLeaf:
-    args_spec = inspect.signature(func)
-    doc = parse(inspect.getdoc(func))
-    desc = doc.short_description
-    spec = ParserLeaf(func, func.__name__, desc)
+class ParserRef(ParserSpec):
+    """A reference to a command in the form 'module:attribute' which is imported only when it is resolved.
 
-    for index, name in enumerate(args_spec.parameters):
-        if index >= len(doc.params):
+    If the name is omitted, it is derived from the attribute in the same way as for functions and classes.
+    """
+
+    __slots__ = ("target",)
+
+    def __init__(self, target: str, name: ty.Optional[str] = None, desc: ty.Optional[str] = None):
+        module, _, attr = target.partition(":")
+
+        if not module or not attr:
+            raise ValueError(f"Expected reference 'module:attribute' but found '{target}'")
+
+        if not name:
+            name = attr.split(".")[-1]
+            name = name.lower() if name[:1].isupper() else name
+
+        super().__init__(name, desc)
+        self.target = target
+
+    def resolve(self, lazy_docs: bool = False) -> ParserSpec:
+        spec = create(import_target(self.target), lazy_docs)
+        spec.name = self.name
+        spec.desc = self.desc or spec.desc
+        return spec
+
+
+def import_target(target: str) -> ty.Any:
+    module, _, attr = target.partition(":")
+    obj = importlib.import_module(module)
+
+    for comp in attr.split("."):
+        obj = getattr(obj, comp)
+
+    return obj
+
+
+def _annotations(func: ty.Callable, args_spec: inspect.Signature) -> ty.Dict[str, ty.Any]:
+    annotations = {name: param.annotation for name, param in args_spec.parameters.items()}
+
+    if any(isinstance(a, str) for a in annotations.values()):
+        try:
+            hints = ty.get_type_hints(func)
+        except Exception as e:
+            raise ValueError(f"Unable to resolve annotations of '{func.__name__}': {e}")
+
+        annotations.update((name, hint) for name, hint in hints.items() if name in annotations)
+
+    return annotations
+
+
+def _intern(s: ty.Optional[str]) -> ty.Optional[str]:
+    # descriptions of generated CLIs are often repeated, equal strings are stored once
+    return sys.intern(s) if s is not None else None
+
+
+def _check_params(doc: Docstring, names: ty.Iterable[str]):
+    params = doc.parse().params
+
+    for index, name in enumerate(names):
+        if index >= len(params):
             raise ValueError(f"Missing description of '{name}'")
 
-        param = doc.params[index]
+        if params[index].arg_name != name:
+            raise ValueError(f"Expected description of '{name}' but found '{params[index].arg_name}'")
+
+
+class LazyInstance(object):
+    """Instance of a command class which is created on the first access, i.e. when one of its commands is invoked."""
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ty.Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self.cls()
+
+        return self._instance
+
+    def __reduce__(self):
+        # worker processes of parallel commands create their own instance
+        return LazyInstance, (self.cls,)
+
+
+class LazyMethod(object):
+    """Method of a command class which is looked up on the lazily created instance when it is called."""
+
+    def __init__(self, instance: LazyInstance, name: str):
+        self.instance = instance
+        self.__name__ = name
+        self.__wrapped__ = getattr(instance.cls, name)
+
+    @property
+    def __signature__(self) -> inspect.Signature:
+        signature = inspect.signature(self.__wrapped__)
+        return signature.replace(parameters=list(signature.parameters.values())[1:])
+
+    def __call__(self, *args, **kwargs):
+        return getattr(self.instance.get(), self.__name__)(*args, **kwargs)
+
+
+def _is_command_class(cls: type, name: str, member: ty.Any) -> bool:
+    # only classes defined in the body which have commands are command groups, so enums, imported classes and
+    # helpers like settings with plain attributes are not
+    return inspect.isclass(member) and member.__qualname__ == f"{cls.__qualname__}.{name}" and \
+        not issubclass(member, enum.Enum) and bool(class_members(member))
+
+
+def class_members(cls: type) -> ty.List[ty.Tuple[str, ty.Any]]:
+    """Return the command names and the members of a command class without instantiating it.
+
+    Regular methods are bound to one `LazyInstance` of the class, class methods are returned as is, nested classes
+    with at least one command are returned as classes.
+    """
+    instance = LazyInstance(cls)
+    result = []
+
+    for k, v in inspect.getmembers(cls):
+        if k.startswith("_"):
+            continue
+
+        if _is_command_class(cls, k, v):
+            result.append((k.lower(), v))
+        elif inspect.ismethod(v):
+            result.append((k, v))
+        elif inspect.isfunction(v) and not isinstance(inspect.getattr_static(cls, k), staticmethod):
+            result.append((k, LazyMethod(instance, k)))
+
+    return result
+
+
+def member(obj: ty.Any, name: str) -> ty.Any:
+    """Return the member of a command object or class by the name of its command without instantiating classes."""
+    value = getattr(obj, name, None)
+
+    if value is None:
+        # nested command classes are named in lower case
+        return dict(class_members(obj if inspect.isclass(obj) else type(obj)))[name]
+    elif not inspect.isclass(obj) or inspect.isclass(value) or inspect.ismethod(value):
+        return value
+    else:
+        return LazyMethod(LazyInstance(obj), name)
+
+
+def _create_from_function(func: ty.Callable, lazy_docs: bool = False) -> ParserLeaf:
+    target = func.__wrapped__ if isinstance(func, LazyMethod) else func
+    args_spec = inspect.signature(target)
 
-        if param.arg_name != name:
-            raise ValueError(f"Expected description of '{name}' but found '{param.arg_name}'")
+    if isinstance(func, LazyMethod):
+        # self is passed by the method when the command is invoked
+        args_spec = args_spec.replace(parameters=list(args_spec.parameters.values())[1:])
+
+    annotations = _annotations(target, args_spec)
+    doc = Docstring(inspect.getdoc(target), target.__name__)
+
+    if lazy_docs:
+        spec = ParserLeaf(func, func.__name__, doc=doc)
+    else:
+        _check_params(doc, args_spec.parameters)
+        spec = ParserLeaf(func, func.__name__, doc.short_description())
+
+    for index, name in enumerate(args_spec.parameters):
+        try:
+            info = types.resolve(annotations[name])
+        except ValueError as e:
+            raise ValueError(f"Unsupported type of '{name}': {e}")
 
-        tpe = str(args_spec.parameters[name].annotation)
         default = args_spec.parameters[name].default
         default = default if default != args_spec.empty else None
-        is_opt, in_type = _is_optional(tpe)
-        options = func.__options__.get(name, None) if hasattr(func, "__options__") else None
+
+        if default is None and info.stream and not info.optional:
+            default = "-"
+
+        options = target.__options__.get(name, None) if hasattr(target, "__options__") else None
         spec.add(Argument(name=name,
-                          tpe=in_type or _type(tpe),
-                          optional=is_opt,
+                          tpe=info.name,
+                          optional=info.optional,
                           default=default,
-                          desc=param.description,
-                          options=options
+                          desc=None if lazy_docs else _intern(doc.parse().params[index].description),
+                          options=options,
+                          info=info,
+                          doc=doc if lazy_docs else None
                           ))
 
     return spec
 
 
-def _create_from_object(obj: object) -> ParserNode:
-    desc = parse(inspect.getdoc(obj)).short_description
-    spec = ParserNode(obj.__class__.__name__.lower(), desc)
+def _create_from_object(obj: object, lazy_docs: bool = False) -> ParserNode:
+    doc = Docstring(inspect.getdoc(obj), obj.__class__.__name__)
+
+    if lazy_docs:
+        spec = ParserNode(obj.__class__.__name__.lower(), doc=doc)
+    else:
+        spec = ParserNode(obj.__class__.__name__.lower(), doc.short_description())
 
     for k, v in inspect.getmembers(obj):
-        if inspect.ismethod(v) and not k.startswith("_"):
-            spec.add(_create_from_function(v))
+        if k.startswith("_"):
+            continue
+
+        # an instance has the same commands as its class, including nested command classes
+        if _is_command_class(obj.__class__, k, v):
+            spec.add(_create_from_class(v, lazy_docs))
+        elif inspect.ismethod(v):
+            spec.add(_create_from_function(v, lazy_docs))
+
+    return spec
+
+
+def _create_from_class(cls: type, lazy_docs: bool = False) -> ParserNode:
+    doc = Docstring(inspect.getdoc(cls), cls.__name__)
+
+    if lazy_docs:
+        spec = ParserNode(cls.__name__.lower(), doc=doc)
+    else:
+        spec = ParserNode(cls.__name__.lower(), doc.short_description())
+
+    for name, value in class_members(cls):
+        if inspect.isclass(value):
+            spec.add(_create_from_class(value, lazy_docs))
+        else:
+            spec.add(_create_from_function(value, lazy_docs))
 
     return spec
 
 
-def _create_from_list(obj: list) -> ParserNode:
+def _create_from_list(obj: list, lazy_docs: bool = False) -> ParserNode:
     spec = ParserNode()
 
     for child in obj:
-        if isinstance(child, ty.Callable):
-            spec.add(_create_from_function(child))
+        if isinstance(child, ParserSpec):
+            spec.add(child)
+        elif isinstance(child, str):
+            spec.add(ParserRef(child))
+        elif inspect.isclass(child):
+            spec.add(_create_from_class(child, lazy_docs))
+        elif isinstance(child, ty.Callable):
+            spec.add(_create_from_function(child, lazy_docs))
         elif isinstance(child, object):
-            spec.add(_create_from_object(child))
+            spec.add(_create_from_object(child, lazy_docs))
 
     return spec
 
 
-def create(obj: ty.Any) -> ParserSpec:
+def create(obj: ty.Any, lazy_docs: bool = False) -> ParserSpec:
+    """Create the specification of the object.
+
+    If `lazy_docs` is set, docstrings are kept raw and parsed only when descriptions are requested. They are not
+    validated in this case, use `check` to find undocumented or misplaced parameters.
+    """
+    with profile.phase("spec"):
+        return _create(obj, lazy_docs)
+
+
+def _create(obj: ty.Any, lazy_docs: bool) -> ParserSpec:
     if inspect.isclass(obj):
-        obj = obj()
-        return _create_from_object(obj)
+        return _create_from_class(obj, lazy_docs)
     elif isinstance(obj, ty.Callable):
-        return _create_from_function(obj)
+        return _create_from_function(obj, lazy_docs)
     elif isinstance(obj, list):
-        return _create_from_list(obj)
+        return _create_from_list(obj, lazy_docs)
     elif isinstance(obj, object):
-        return _create_from_object(obj)
-
-
-def _is_optional(tpe: str) -> (bool, ty.Optional[str]):
-    result = re.search(r"typing.Union\[(.+), NoneType]", tpe)
+        return _create_from_object(obj, lazy_docs)
 
-    if not result:
-        result = re.search(r"typing.Optional\[(.+)]", tpe)
 
-    return (True, result.group(1)) if result else (False, None)
+def check(obj: ty.Any):
+    """Validate the docstrings of all commands, including referenced ones, which are imported for this.
 
+    Raises ValueError if a parameter is not documented or the descriptions don't follow the order of parameters.
+    """
+    _check(obj if isinstance(obj, ParserSpec) else create(obj, lazy_docs=True))
 
-def _is_bool(tpe: str) -> bool:
-    return tpe == "<class 'bool'>"
 
+def _check(sp: ParserSpec):
+    if isinstance(sp, ParserRef):
+        sp = sp.resolve(lazy_docs=True)
 
-def _type(tpe: str) -> str:
-    result = re.search(r"<class '(.+)'", tpe)
-    return result.group(1) if result else tpe
-
-
-def get_class(class_name):
-    parts = class_name.split('.')
-    module = ".".join(parts[:-1])
-    if module:
-        m = __import__(module)
-        for comp in parts[1:]:
-            m = getattr(m, comp)
-        return m
-    elif class_name == "int":
-        return int
-    elif class_name == "float":
-        return float
-    elif class_name == "bool":
-        return bool
-    elif class_name == "str":
-        return str
-    else:
-        return globals()[class_name]
+    if isinstance(sp, ParserLeaf):
+        if sp.doc is not None:
+            try:
+                _check_params(sp.doc, [arg.name for arg in sp.args])
+            except ValueError as e:
+                raise ValueError(f"Invalid docstring of '{sp.name}': {e}")
+    elif isinstance(sp, ParserNode):
+        for child in sp.children:
+            _check(child)
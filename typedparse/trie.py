@@ -0,0 +1,88 @@
+import typing as ty
+
+
+class _Node(object):
+    __slots__ = ("children", "key", "index", "count", "first")
+
+    def __init__(self):
+        self.children: ty.Dict[str, _Node] = {}
+        self.key: ty.Optional[str] = None
+        self.index = 0
+        self.count = 0
+        self.first: ty.Optional[str] = None
+
+
+class PrefixTrie(object):
+    """Prefix tree of strings such as flags and names of commands.
+
+    Exact lookups and checks that a prefix is unambiguous take time proportional to the length of the prefix, only
+    listing all the keys of an ambiguous prefix visits the keys which start with it.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, keys: ty.Iterable[str] = ()):
+        self._root = _Node()
+        self._size = 0
+
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        node = self._find(key)
+        return node is not None and node.key is not None
+
+    def add(self, key: str):
+        if key in self:
+            return
+
+        node = self._root
+        path = [node]
+
+        for c in key:
+            node = node.children.setdefault(c, _Node())
+            path.append(node)
+
+        node.key = key
+        node.index = self._size
+        self._size += 1
+
+        for visited in path:
+            visited.count += 1
+            visited.first = visited.first if visited.first is not None else key
+
+    def complete(self, prefix: str) -> ty.List[str]:
+        """Return the keys which start with the prefix in the order they were added."""
+        node = self._find(prefix)
+
+        if node is None or node.count == 0:
+            return []
+        elif node.count == 1:
+            return [node.first]
+
+        found = []
+        pending = [node]
+
+        while pending:
+            node = pending.pop()
+
+            if node.key is not None:
+                found.append((node.index, node.key))
+
+            pending.extend(node.children.values())
+
+        return [key for _, key in sorted(found)]
+
+    def _find(self, prefix: str) -> ty.Optional[_Node]:
+        node = self._root
+
+        for c in prefix:
+            node = node.children.get(c)
+
+            if node is None:
+                return None
+
+        return node
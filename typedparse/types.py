@@ -0,0 +1,444 @@
+import argparse
+import array
+import builtins
+import collections.abc
+import enum
+import inspect
+import mmap
+import os
+import stat
+import sys
+import typing as ty
+from dataclasses import dataclass
+
+try:
+    from types import UnionType
+except ImportError:  # Python < 3.10
+    UnionType = None
+
+_NoneType = type(None)
+
+_streams = {
+    collections.abc.Iterator: "typing.Iterator",
+    collections.abc.Iterable: "typing.Iterable"
+}
+
+_containers = {
+    list: "typing.List",
+    tuple: "typing.Tuple",
+    set: "typing.Set",
+    frozenset: "typing.FrozenSet"
+}
+
+
+def to_bool(s: str) -> bool:
+    if s.lower() in ['yes', 'true', 't', 'y', '1']:
+        return True
+    elif s.lower() in ['no', 'false', 'f', 'n', '0']:
+        return False
+    else:
+        raise ValueError(f"Boolean required but found {s}")
+
+
+class EnumConverter(object):
+    """Convert a member name into a member of the enumeration."""
+
+    def __init__(self, enum_class: ty.Type[enum.Enum]):
+        self.enum_class = enum_class
+        self.__name__ = enum_class.__name__
+
+    def __call__(self, s: str) -> enum.Enum:
+        try:
+            return self.enum_class[s]
+        except KeyError:
+            raise ValueError(s)
+
+
+class UnionConverter(object):
+    """Try the converters one by one and return the first successfully converted value."""
+
+    def __init__(self, converters: ty.Sequence[ty.Callable[[str], ty.Any]]):
+        self.converters = tuple(converters)
+        self.__name__ = " or ".join(getattr(c, "__name__", repr(c)) for c in self.converters)
+
+    def __call__(self, s: str) -> ty.Any:
+        for converter in self.converters:
+            try:
+                return converter(s)
+            except (ValueError, TypeError):
+                pass
+
+        raise ValueError(s)
+
+
+def tokens(f: ty.TextIO, delimiter: ty.Optional[str] = None, size: int = 1 << 16) -> ty.Iterator[str]:
+    """Split a text stream into tokens reading it by large chunks.
+
+    Args:
+        f: A text stream.
+        delimiter: A delimiter of tokens, any whitespace by default. Empty tokens are skipped.
+        size: Size of a chunk in characters.
+    """
+    rest = ""
+
+    while True:
+        chunk = f.read(size)
+
+        if not chunk:
+            break
+
+        text = rest + chunk
+        parts = text.split(delimiter)
+        # the last token may continue in the next chunk unless the chunk ends with whitespace
+        rest = "" if delimiter is None and text[-1].isspace() else parts.pop()
+
+        for part in parts:
+            if part:
+                yield part
+
+    if rest:
+        yield rest
+
+
+class StreamConverter(object):
+    """Open a source of tokens, '-' for stdin or a path of a file, and return a lazy iterator of converted items."""
+
+    __name__ = "file"
+
+    def __init__(self, converter: ty.Callable[[str], ty.Any], choices: ty.Optional[ty.Tuple] = None,
+                 delimiter: ty.Optional[str] = None):
+        self.converter = converter
+        self.choices = choices
+        self.delimiter = delimiter
+
+    def __call__(self, source: str) -> ty.Iterator[ty.Any]:
+        if source == "-":
+            return self._items(sys.stdin, False)
+
+        try:
+            f = open(source)
+        except OSError as e:
+            raise argparse.ArgumentTypeError(f"can't open '{source}': {e.strerror}")
+
+        return self._items(f, True)
+
+    def _items(self, f: ty.TextIO, close: bool) -> ty.Iterator[ty.Any]:
+        try:
+            for token in tokens(f, self.delimiter):
+                value = self.converter(token)
+
+                if self.choices is not None and value not in self.choices:
+                    raise ValueError(f"Invalid choice: {token}")
+
+                yield value
+        finally:
+            if close:
+                f.close()
+
+
+class MappedBytes(object):
+    """Read-only memory mapping of a file, the path of the file is converted into it when it's used as a type.
+
+    The file is mapped once the argument is converted, its pages are read only when they are accessed, so the size of
+    the file doesn't affect parsing or memory usage. The mapping can be closed only when no views of it are alive.
+
+    Attributes:
+        path: Path of the file.
+        mmap: The mapping or None if the file is empty, since empty files can't be mapped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+
+                if not stat.S_ISREG(st.st_mode):
+                    raise argparse.ArgumentTypeError(f"can't map '{path}': not a regular file")
+
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else None
+        except OSError as e:
+            raise argparse.ArgumentTypeError(f"can't open '{path}': {e.strerror}")
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(f"can't map '{path}': {e}")
+
+    def __len__(self) -> int:
+        return len(self.mmap) if self.mmap is not None else 0
+
+    def __iter__(self) -> ty.Iterator[ty.Any]:
+        return self.lines()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def view(self) -> memoryview:
+        """Read-only memoryview of the whole file which doesn't copy its contents."""
+        return memoryview(self.mmap if self.mmap is not None else b"")
+
+    def lines(self) -> ty.Iterator[bytes]:
+        """Iterate over the lines of the file including line endings like a file opened in binary mode."""
+        data = self.mmap
+
+        if data is None:
+            return
+
+        start = 0
+        size = len(data)
+
+        while start < size:
+            end = data.find(b"\n", start)
+            end = size if end < 0 else end + 1
+            yield data[start:end]
+            start = end
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+
+
+class MappedFile(MappedBytes):
+    """Read-only memory mapping of a text file, its lines are decoded one by one as they are consumed.
+
+    Attributes:
+        encoding: Encoding of the file, UTF-8.
+    """
+
+    encoding = "utf-8"
+
+    def lines(self) -> ty.Iterator[str]:
+        """Iterate over the decoded lines of the file including line endings, which are not translated."""
+        for line in super().lines():
+            yield line.decode(self.encoding)
+
+
+_typecodes = {int: "q", float: "d"}
+
+
+class ArrayConverter(object):
+    """Convert all tokens of a list argument at once into an `array.array` or a NumPy array and check their range.
+
+    Args:
+        tpe: Type of items, int or float.
+        dtype: Name of a NumPy dtype, `array.array` is used if it's not set.
+        min: Minimal allowed value.
+        max: Maximal allowed value.
+    """
+
+    def __init__(self, tpe: type, dtype: ty.Optional[str] = None, min: ty.Optional[ty.Any] = None,
+                 max: ty.Optional[ty.Any] = None):
+        if dtype is None and tpe not in _typecodes:
+            raise ValueError(f"Arrays of {type_name(tpe)} are not supported")
+
+        self.tpe = tpe
+        self.dtype = dtype
+        self.min = min
+        self.max = max
+
+    def __call__(self, value: ty.Any) -> ty.Any:
+        if not isinstance(value, list):
+            return value
+
+        try:
+            if self.dtype is None:
+                values = array.array(_typecodes[self.tpe], map(self.tpe, value))
+            else:
+                values = sys.modules["numpy"].array(value, dtype=self.dtype)
+        except (OverflowError, TypeError) as e:
+            raise ValueError(str(e))
+
+        if len(values) and (self.min is not None or self.max is not None):
+            # ndarray.min() and builtin min() over array.array both run without boxing a list of values
+            low, high = (values.min(), values.max()) if self.dtype is not None else (min(values), max(values))
+
+            if self.min is not None and low < self.min:
+                raise ValueError(f"{low} is less than the minimum {self.min}")
+
+            if self.max is not None and high > self.max:
+                raise ValueError(f"{high} is greater than the maximum {self.max}")
+
+        return values
+
+
+def _numpy_array(annotation: ty.Any) -> ty.Optional[ArrayConverter]:
+    # NumPy is never imported here, an annotation which refers to it means that it's imported already
+    numpy = sys.modules.get("numpy")
+
+    if numpy is None or not (annotation is numpy.ndarray or ty.get_origin(annotation) is numpy.ndarray):
+        return None
+
+    args = ty.get_args(annotation)
+    dtype_args = ty.get_args(args[1]) if len(args) == 2 else ()
+    dtype = numpy.dtype(dtype_args[0] if dtype_args and dtype_args[0] is not ty.Any else numpy.float64)
+
+    if numpy.issubdtype(dtype, numpy.integer):
+        tpe = int
+    elif numpy.issubdtype(dtype, numpy.floating):
+        tpe = float
+    else:
+        raise ValueError(f"Arrays of {dtype} are not supported")
+
+    return ArrayConverter(tpe, dtype.name)
+
+
+@dataclass(frozen=True)
+class TypeInfo(object):
+    """Resolved type of a formal parameter.
+
+    Attributes:
+        name: Name of the type without Optional, e.g. 'int' or 'typing.List[int]'.
+        tpe: Type of a single value, i.e. the type of items for containers.
+        optional: True if the type is wrapped into Optional.
+        converter: Function which converts a single command-line token into a value of `tpe`.
+        container: Type of the container (list, tuple, set or frozenset) if any.
+        nargs: Exact number of items for fixed-length tuples.
+        choices: Allowed values for Literal and Enum types.
+        stream: True for Iterator and Iterable types, the argument is a source of items and the converter returns
+            a lazy iterator.
+        bulk: Converter of the whole list of tokens for NumPy arrays, the tokens are not converted one by one.
+    """
+    name: str
+    tpe: ty.Any
+    optional: bool
+    converter: ty.Callable[[str], ty.Any]
+    container: ty.Optional[type] = None
+    nargs: ty.Optional[int] = None
+    choices: ty.Optional[ty.Tuple] = None
+    stream: bool = False
+    bulk: ty.Optional[ArrayConverter] = None
+
+    @property
+    def is_bool(self) -> bool:
+        return self.tpe is bool and self.container is None
+
+    def finalize(self, value: ty.Any) -> ty.Any:
+        """Convert a list of parsed values into the container type."""
+        if self.bulk is not None:
+            return self.bulk(value)
+        elif self.container is not None and self.container is not list and isinstance(value, list):
+            return self.container(value)
+
+        return value
+
+
+def type_name(tpe: ty.Any) -> str:
+    if ty.get_origin(tpe) is ty.Union or (UnionType is not None and isinstance(tpe, UnionType)):
+        return "typing.Union[" + ", ".join(type_name(t) for t in ty.get_args(tpe)) + "]"
+    elif inspect.isclass(tpe) and ty.get_origin(tpe) is None:
+        if tpe.__module__ == builtins.__name__:
+            return tpe.__qualname__
+        else:
+            return f"{tpe.__module__}.{tpe.__qualname__}"
+    else:
+        return repr(tpe)
+
+
+def _scalar(tpe: ty.Any) -> ty.Tuple[ty.Callable[[str], ty.Any], ty.Optional[ty.Tuple]]:
+    origin = ty.get_origin(tpe)
+
+    if origin is ty.Literal:
+        choices = ty.get_args(tpe)
+        types = {type(c) for c in choices}
+
+        if len(types) != 1:
+            raise ValueError(f"Literal values must be of the same type but found {tpe}")
+
+        return _scalar(types.pop())[0], choices
+    elif origin is ty.Union or (UnionType is not None and isinstance(tpe, UnionType)):
+        return UnionConverter([_scalar(t)[0] for t in ty.get_args(tpe)]), None
+    elif tpe is bool:
+        return to_bool, None
+    elif inspect.isclass(tpe) and issubclass(tpe, enum.Enum):
+        return EnumConverter(tpe), tuple(tpe)
+    elif inspect.isclass(tpe) and origin is None:
+        return tpe, None
+    else:
+        raise ValueError(f"Unsupported type {tpe}")
+
+
+_resolved: ty.Dict[ty.Any, TypeInfo] = {}
+
+
+def _key(annotation: ty.Any) -> ty.Any:
+    # Union[int, str] == Union[str, int] but the order of converters differs, so the arguments are a part of the key
+    args = ty.get_args(annotation)
+    return (annotation, tuple(_key(arg) for arg in args)) if args else annotation
+
+
+def resolve(annotation: ty.Any) -> TypeInfo:
+    """Resolve an annotation of a formal parameter into a TypeInfo.
+
+    TypeInfo is immutable, so it is shared by all parameters with the same annotation.
+    """
+    try:
+        key = _key(annotation)
+        info = _resolved.get(key)
+    except TypeError:  # unhashable annotation
+        return _resolve(annotation)
+
+    if info is None:
+        info = _resolved[key] = _resolve(annotation)
+
+    return info
+
+
+def _resolve(annotation: ty.Any) -> TypeInfo:
+    if annotation is inspect.Parameter.empty or annotation is ty.Any:
+        annotation = str
+
+    optional = False
+    origin = ty.get_origin(annotation)
+
+    if origin is ty.Union or (UnionType is not None and isinstance(annotation, UnionType)):
+        args = ty.get_args(annotation)
+        types = [t for t in args if t is not _NoneType]
+        optional = len(types) < len(args)
+        annotation = types[0] if len(types) == 1 else ty.Union[tuple(types)]
+        origin = ty.get_origin(annotation)
+
+    if inspect.isclass(annotation) and annotation in _containers:
+        origin = annotation
+
+    bulk = _numpy_array(annotation)
+
+    if bulk is not None:
+        name = f"numpy.ndarray[{bulk.dtype}]"
+        return TypeInfo(name, bulk.tpe, optional, bulk.tpe, sys.modules["numpy"].ndarray, bulk=bulk)
+
+    if inspect.isclass(annotation) and annotation in _streams:
+        origin = annotation
+
+    if origin in _streams:
+        args = ty.get_args(annotation)
+        tpe = args[0] if args else str
+        converter, choices = _scalar(tpe)
+        name = f"{_streams[origin]}[{type_name(tpe)}]"
+        return TypeInfo(name, tpe, optional, StreamConverter(converter, choices), stream=True)
+    elif origin in _containers:
+        args = ty.get_args(annotation)
+        nargs = None
+
+        if origin is tuple and len(args) == 2 and args[1] is Ellipsis:
+            tpe = args[0]
+            name = f"typing.Tuple[{type_name(tpe)}, ...]"
+        elif origin is tuple and args:
+            tpe = args[0]
+            nargs = len(args)
+
+            if any(t != tpe for t in args):
+                raise ValueError(f"Tuples with different types of items are not supported: {annotation}")
+
+            name = "typing.Tuple[" + ", ".join(type_name(t) for t in args) + "]"
+        else:
+            tpe = args[0] if args else str
+            name = f"{_containers[origin]}[{type_name(tpe)}]"
+
+        converter, choices = _scalar(tpe)
+        return TypeInfo(name, tpe, optional, converter, origin, nargs, choices)
+    else:
+        converter, choices = _scalar(annotation)
+        return TypeInfo(type_name(annotation), annotation, optional, converter, choices=choices)
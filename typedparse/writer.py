@@ -0,0 +1,115 @@
+import inspect
+import json
+import os
+import sys
+import typing as ty
+
+import typedparse.profile as profile
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+_escapes = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _line(item: ty.Any) -> str:
+    return f"{item}\n"
+
+
+def _jsonl(item: ty.Any) -> str:
+    return _encode(item) + "\n"
+
+
+def _tsv(item: ty.Any) -> str:
+    if isinstance(item, dict):
+        item = item.values()
+    elif isinstance(item, (str, bytes)) or not isinstance(item, ty.Iterable):
+        item = (item,)
+
+    return "\t".join(str(field).translate(_escapes) for field in item) + "\n"
+
+
+_formatters: ty.Dict[str, ty.Callable[[ty.Any], str]] = {
+    "lines": _line,
+    "jsonl": _jsonl,
+    "tsv": _tsv
+}
+
+FORMATS = tuple(_formatters)
+
+
+def check_format(fmt: ty.Optional[str]):
+    if fmt is not None and fmt not in _formatters:
+        raise ValueError(f"Unknown output format '{fmt}', expected one of {', '.join(FORMATS)}")
+
+
+def _items(result: ty.Any) -> ty.Iterable[ty.Any]:
+    if result is None:
+        return ()
+    elif isinstance(result, (str, bytes, dict)) or not isinstance(result, ty.Iterable):
+        return (result,)
+
+    return result
+
+
+def _discard_stdout():
+    """Point the file descriptor of stdout to devnull, so that flushing it at exit doesn't fail again."""
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+    except (AttributeError, OSError, ValueError):
+        pass
+
+
+def write(result: ty.Any, fmt: str, flush: ty.Optional[int] = None, stream: ty.Optional[ty.TextIO] = None,
+          buffer_size: int = 1 << 16):
+    """Write the return value of a command to stdout.
+
+    An iterable, e.g. a generator, is written item by item, any other value except None is written as a single item.
+    Formatted items are joined into large chunks, so the cost of a write is shared by many items. If the reader
+    closes the pipe, the rest of the items are not consumed and the process exits with status 1 without a traceback.
+
+    Args:
+        result: The return value of a command.
+        fmt: Output format: 'lines' writes `str` of each item, 'jsonl' writes each item as JSON and 'tsv' writes
+            tuples, lists or dicts as tab-separated fields with tabs, newlines and backslashes escaped.
+        flush: Flush the output after every `flush` items, by default it's flushed only when the buffer is full and
+            at the end.
+        stream: A stream to write to, stdout by default.
+        buffer_size: Number of characters which are buffered before they are written.
+    """
+    formatter = _formatters[fmt]
+    items = _items(result)
+    out = stream or sys.stdout
+    chunk: ty.List[str] = []
+    size = 0
+    pending = 0
+
+    try:
+        with profile.phase("output"):
+            try:
+                for item in items:
+                    line = formatter(item)
+                    chunk.append(line)
+                    size += len(line)
+                    pending += 1
+
+                    if size >= buffer_size or pending == flush:
+                        out.write("".join(chunk))
+                        chunk.clear()
+                        size = 0
+
+                        if pending == flush:
+                            out.flush()
+                            pending = 0
+            finally:
+                # items which were produced before an error are written as well
+                out.write("".join(chunk))
+                out.flush()
+    except BrokenPipeError:
+        if stream is None:
+            _discard_stdout()
+
+        raise SystemExit(1)
+    finally:
+        if inspect.isgenerator(items):
+            items.close()